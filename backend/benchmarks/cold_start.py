@@ -0,0 +1,90 @@
+"""Cold start: time from a fresh interpreter to the first answered request, with Neo4j unreachable.
+
+Each run is a new process that imports main, enters the app lifespan and calls /health through
+an ASGI transport. Neo4j points at a closed port, so a startup that blocks on the database shows up.
+
+Usage (from the backend directory):
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 10 --target 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints one JSON line of timings
+PROBE = """
+import time
+started = time.perf_counter()
+import asyncio, json
+import httpx
+import main
+imported = time.perf_counter()
+
+async def first_request():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            response = await client.get("/health")
+        return ready, time.perf_counter(), response.json()["status"]
+
+ready, answered, status = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - imported,
+    "first_request": answered - started,
+    "status": status,
+}))
+"""
+
+
+def run_once(workdir: str) -> dict:
+    env = dict(
+        os.environ,
+        NEO4J_URI="bolt://127.0.0.1:9",
+        NEO4J_USERNAME="neo4j",
+        NEO4J_PASSWORD="cold-start",
+        GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "fake"),
+        CACHE_PATH=os.path.join(workdir, "cache.db"),
+        TRANSCRIPT_STORE_PATH=os.path.join(workdir, "transcripts.db"),
+        TTS_CACHE_PATH=os.path.join(workdir, "tts_cache.db"),
+        INGEST_DB_PATH=os.path.join(workdir, "ingest.db"),
+        SINGLEFLIGHT_LOCK_DIR=os.path.join(workdir, "locks"),
+        INGEST_RESUME_ON_STARTUP="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--target", type=float, default=float(os.getenv("COLD_START_TARGET_SECONDS", "1.0")),
+        help="fail if the median time to the first request exceeds this many seconds",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="vidinsights-cold-")
+    runs = [run_once(workdir) for _ in range(args.runs)]
+    for name in ("import", "startup", "first_request"):
+        values = [run[name] for run in runs]
+        print(f"{name:<14} median {statistics.median(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+    print(f"status         {', '.join(sorted({run['status'] for run in runs}))}")
+
+    median = statistics.median(run["first_request"] for run in runs)
+    if median > args.target:
+        print(f"Cold start of {median:.2f}s is over the {args.target:.2f}s target")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,73 @@
+"""Transcript compaction time and the shape of its output, for caption styles that stress the segment merging.
+
+Fails if compaction stops scaling linearly, or if a compacted segment spans more than
+compaction.MAX_MERGED_SECONDS or grows past MAX_MERGED_CHARS, which keeps map-reduce chunks
+(broken only between segments) close to CHUNK_CHARS.
+
+Usage (from the backend directory):
+    python benchmarks/compaction_benchmark.py --minutes 10 60 180
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py validates these at import time; the benchmark never talks to Neo4j
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "")
+os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "benchmark-cache.db"))
+
+import main  # noqa: E402
+from compaction import MAX_MERGED_CHARS, MAX_MERGED_SECONDS, compact_transcript  # noqa: E402
+from benchmarks.fixtures import make_cjk_transcript, make_short_captions, make_transcript  # noqa: E402
+
+CAPTION_STYLES = {
+    "clean": lambda minutes: make_transcript(minutes),
+    "auto-captions": lambda minutes: make_transcript(minutes, auto_captions=True),
+    "short captions": make_short_captions,
+    "japanese": make_cjk_transcript,
+}
+
+
+def longest_span(segments) -> float:
+    return max((segment.get("duration", 0) for segment in segments), default=0)
+
+
+def run(minutes_list):
+    print(f"{'style':<15} {'minutes':>8} {'segments':>9} {'compacted':>10} {'ms':>9} {'max span s':>11} {'max chunk':>10}")
+    failures = []
+    for style, make in CAPTION_STYLES.items():
+        per_segment = []
+        for minutes in minutes_list:
+            transcript_data = make(minutes)
+            started = time.perf_counter()
+            compacted = compact_transcript(transcript_data)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            per_segment.append(elapsed_ms / len(transcript_data))
+            span = longest_span(compacted)
+            chunk = max(len(chunk["text"]) for chunk in main.chunk_transcript(compacted))
+            print(
+                f"{style:<15} {minutes:>8g} {len(transcript_data):>9} {len(compacted):>10} "
+                f"{elapsed_ms:>9.1f} {span:>11.1f} {chunk:>10}"
+            )
+            if span > MAX_MERGED_SECONDS:
+                failures.append(f"{style} {minutes:g}m: a segment spans {span:.1f}s")
+            longest = max(len(segment["text"]) for segment in compacted)
+            if longest > max(MAX_MERGED_CHARS, max(len(entry["text"]) for entry in transcript_data)):
+                failures.append(f"{style} {minutes:g}m: a segment grew to {longest} characters")
+        # Time per caption should not grow with the transcript length
+        if len(per_segment) > 1 and per_segment[-1] > 4 * per_segment[0]:
+            failures.append(f"{style}: compaction time per caption grows with length")
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 180])
+    run(parser.parse_args().minutes)
@@ -0,0 +1,129 @@
+"""Cross-video entity queries against the in-memory Neo4j stand-in: cold vs. cached latency and round trips.
+
+A synthetic library is written through main._write_graph, with entity popularity following a
+Zipf curve so a few entities are hubs mentioned by many videos. Two videos spell the same
+entity differently, and the run fails if the entity index does not match them together.
+
+Usage (from the backend directory):
+    python benchmarks/entity_index_benchmark.py --videos 1000 10000
+    python benchmarks/entity_index_benchmark.py --videos 10000 --neo4j-latency 0.005
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "")
+os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "benchmark-cache.db"))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fixtures import VERBS  # noqa: E402
+from benchmarks.standins import FakeNeo4jDriver  # noqa: E402
+
+
+def entity_name(rank: int) -> str:
+    return f"Entity {rank}"
+
+
+def zipf_rank(rng: random.Random, vocabulary: int) -> int:
+    # Inverse transform of a 1/x density: rank 1 is drawn far more often than rank 1000
+    return max(1, min(vocabulary, int(vocabulary ** rng.random())))
+
+
+async def build_library(driver: FakeNeo4jDriver, videos: int, vocabulary: int, seed: int = 7):
+    rng = random.Random(seed)
+    latency, driver.latency = driver.latency, 0.0
+    async with driver.session() as session:
+        for i in range(videos):
+            triples = [
+                {
+                    "entity1": entity_name(zipf_rank(rng, vocabulary)),
+                    "relationship": rng.choice(VERBS),
+                    "entity2": entity_name(zipf_rank(rng, vocabulary)),
+                }
+                for _ in range(10)
+            ]
+            await session.execute_write(main._write_graph, f"video{i:06d}", triples)
+        # The same landmark, spelled two ways by two videos
+        await session.execute_write(main._write_graph, "spelling-a", [{"entity1": "The Eiffel Tower", "relationship": "is in", "entity2": "Paris"}])
+        await session.execute_write(main._write_graph, "spelling-b", [{"entity1": "eiffel tower", "relationship": "was built for", "entity2": "World's Fair"}])
+    driver.latency = latency
+
+
+async def timed(client: httpx.AsyncClient, driver: FakeNeo4jDriver, path: str, params: dict):
+    queries = driver.queries
+    started = time.perf_counter()
+    response = await client.get(path, params=params)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000, driver.queries - queries, response.json()
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    print(f"{'videos':>7} {'query':<16} {'cold ms':>9} {'cold rt':>8} {'warm ms':>9} {'warm rt':>8}")
+    for videos in args.videos:
+        driver = FakeNeo4jDriver()
+        driver.latency = args.neo4j_latency
+        main.neo4j_driver = driver
+        main.graph_status.update(available=True, error=None)
+        main.entity_index._cache.clear()
+        await build_library(driver, videos, args.vocabulary)
+
+        rng = random.Random(videos)
+
+        def mentioned_entity():
+            # An entity of a random video, so popular entities are probed as often as they are mentioned
+            triple = rng.choice(driver.graphs[f"video{rng.randrange(videos):06d}"])
+            return triple[rng.choice(["entity1", "entity2"])]
+
+        probes = {
+            "entity videos": ("/entities/videos", lambda: {"name": mentioned_entity().lower()}),
+            "related (2 hops)": ("/entities/related", lambda: {"name": mentioned_entity(), "hops": 2}),
+            "related videos": ("/videos/{}/related", lambda: {"video_id": f"video{rng.randrange(videos):06d}"}),
+        }
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            found = (await timed(client, driver, "/entities/videos", {"name": "Eiffel Tower"}))[2]
+            if sorted(video["video_id"] for video in found["videos"]) != ["spelling-a", "spelling-b"]:
+                raise SystemExit(f"Spellings of one entity were not matched together: {found}")
+
+            for label, (path, make_params) in probes.items():
+                cold, warm = [], []
+                for _ in range(args.samples):
+                    params = make_params()
+                    if "video_id" in params:
+                        path_for = path.format(params.pop("video_id"))
+                    else:
+                        path_for = path
+                    main.entity_index._cache.clear()
+                    cold.append(await timed(client, driver, path_for, params))
+                    warm.append(await timed(client, driver, path_for, params))
+                print(
+                    f"{videos:>7} {label:<16} "
+                    f"{statistics.median(ms for ms, _, _ in cold):>9.1f} {statistics.mean(rt for _, rt, _ in cold):>8.1f} "
+                    f"{statistics.median(ms for ms, _, _ in warm):>9.1f} {statistics.mean(rt for _, rt, _ in warm):>8.1f}"
+                )
+    print(f"cache: {main.entity_index.metrics()}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--vocabulary", type=int, default=5000, help="distinct entities in the library")
+    parser.add_argument("--samples", type=int, default=20, help="queries per kind and library size")
+    parser.add_argument("--neo4j-latency", type=float, default=0.005, help="seconds per stand-in round trip")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
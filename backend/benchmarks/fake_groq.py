@@ -0,0 +1,148 @@
+"""Local stand-in for the Groq API, for exercising the LLM scheduler and load tests without a quota.
+
+Usage (from the backend directory):
+    python benchmarks/fake_groq.py --port 9000 --latency 0.5 --rate-limit-every 5
+    GROQ_BASE_URL=http://localhost:9000 GROQ_API_KEY=fake uvicorn main:app
+
+Completions are canned but shaped like the real ones: triples for graph prompts, the
+input object echoed back for JSON translations, and a structured summary otherwise.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+
+settings = {"latency": 0.2, "rate_limit_every": 0, "retry_after": 1.0, "error_every": 0}
+counter = itertools.count(1)
+stats = {"requests": 0, "rate_limited": 0, "errors": 0, "completions": 0, "prompt_chars": 0}
+
+SUMMARY = {
+    "key_takeaway": "The speaker explains how the system works end to end.",
+    "key_points": ["Point one", "Point two", "Point three"],
+    "how_it_started": "It began as a small experiment.",
+    "top_topics": [
+        {"topic": "Introduction", "timestamp": "00:00", "description": "Setting the scene"},
+        {"topic": "Details", "timestamp": "05:30", "description": "How it works"},
+    ],
+    "tags": ["demo", "fake"],
+    "new_things": ["A new idea"],
+    "summary": "This is a canned summary from the fake Groq server. " * 5,
+}
+
+
+def completion_text(body: dict) -> str:
+    prompt = body["messages"][-1]["content"]
+    if "entity1|relationship|entity2" in prompt:
+        return "\n".join(f"Entity {i}|relates to|Entity {i + 1}" for i in range(10))
+    batch = re.search(r"with exactly (\d+) answers", prompt)
+    if batch:
+        return json.dumps({"answers": [f"A canned answer {i + 1} from the fake Groq server." for i in range(int(batch.group(1)))]})
+    json_input = re.search(r"JSON:\s*(\{.*\})\s*$", prompt, re.DOTALL)
+    if json_input:
+        return json_input.group(1)
+    if (body.get("response_format") or {}).get("type") == "json_object" or "JSON" in prompt:
+        return json.dumps(SUMMARY)
+    return "A canned answer from the fake Groq server."
+
+
+def usage(body: dict, text: str) -> dict:
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in body["messages"]) // 4
+    completion_tokens = len(text) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def injected_failure():
+    count = next(counter)
+    stats["requests"] += 1
+    if settings["rate_limit_every"] and count % settings["rate_limit_every"] == 0:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": str(settings["retry_after"])},
+        )
+    if settings["error_every"] and count % settings["error_every"] == 0:
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "Internal error", "type": "internal_server_error"}}, status_code=503)
+    return None
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    failure = injected_failure()
+    if failure is not None:
+        return failure
+
+    text = completion_text(body)
+    stats["completions"] += 1
+    stats["prompt_chars"] += sum(len(str(message.get("content", ""))) for message in body["messages"])
+    created = int(time.time())
+    completion_id = f"chatcmpl-fake-{created}"
+
+    if body.get("stream"):
+        async def events():
+            pieces = [text[i:i + 20] for i in range(0, len(text), 20)]
+            for piece in pieces:
+                await asyncio.sleep(settings["latency"] / max(len(pieces), 1))
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(settings["latency"])
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": body["model"],
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": usage(body, text),
+    }
+
+
+@app.post("/openai/v1/audio/transcriptions")
+async def transcriptions():
+    failure = injected_failure()
+    if failure is not None:
+        return failure
+    await asyncio.sleep(settings["latency"])
+    return {"text": "What is this video about?"}
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Groq API server")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=settings["latency"], help="seconds per completion")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=settings["retry_after"], help="Retry-After seconds on 429")
+    parser.add_argument("--error-every", type=int, default=0, help="answer every Nth request with 503")
+    args = parser.parse_args()
+    settings.update(
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        error_every=args.error_every,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
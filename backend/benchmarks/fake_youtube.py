@@ -0,0 +1,67 @@
+"""Local stand-in for YouTube's oEmbed endpoint, for exercising the fetch pool without touching YouTube.
+
+Usage (from the backend directory):
+    python benchmarks/fake_youtube.py --port 9100 --latency 0.1 --handshake 0.05
+    YOUTUBE_OEMBED_URL=http://localhost:9100/oembed uvicorn main:app
+
+Video IDs starting with "missing" answer 404, like private or deleted videos. Each new
+connection is delayed by --handshake seconds to stand in for a TLS handshake, so pooled
+and per-request connections can be told apart; /stats counts requests and connections.
+"""
+import argparse
+import asyncio
+import itertools
+from urllib.parse import parse_qs, urlparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+
+settings = {"latency": 0.1, "handshake": 0.05, "rate_limit_every": 0}
+counter = itertools.count(1)
+stats = {"requests": 0, "connections": 0, "not_found": 0, "rate_limited": 0}
+_seen_connections = set()
+
+
+@app.get("/oembed")
+async def oembed(request: Request, url: str, format: str = "json"):
+    stats["requests"] += 1
+    client = (request.client.host, request.client.port) if request.client else None
+    if client not in _seen_connections:
+        _seen_connections.add(client)
+        stats["connections"] += 1
+        await asyncio.sleep(settings["handshake"])
+    await asyncio.sleep(settings["latency"])
+
+    if settings["rate_limit_every"] and next(counter) % settings["rate_limit_every"] == 0:
+        stats["rate_limited"] += 1
+        return JSONResponse({"error": "Too Many Requests"}, status_code=429)
+    video_id = (parse_qs(urlparse(url).query).get("v") or [""])[0]
+    if not video_id or video_id.startswith("missing"):
+        stats["not_found"] += 1
+        return JSONResponse({"error": "Not Found"}, status_code=404)
+    return {"title": f"Video {video_id}", "author_name": "Fake Channel", "type": "video"}
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def reset():
+    stats.update(requests=0, connections=0, not_found=0, rate_limited=0)
+    _seen_connections.clear()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake YouTube oEmbed server")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=settings["latency"], help="seconds per request")
+    parser.add_argument("--handshake", type=float, default=settings["handshake"], help="extra seconds per new connection")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    args = parser.parse_args()
+    settings.update(latency=args.latency, handshake=args.handshake, rate_limit_every=args.rate_limit_every)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
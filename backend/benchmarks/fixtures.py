@@ -0,0 +1,144 @@
+"""Deterministic synthetic transcripts shaped like YouTube auto-captions, plus recorded real ones.
+
+Record real transcripts for the load test (from the backend directory):
+    python benchmarks/fixtures.py record --out benchmarks/recorded VIDEO_ID [VIDEO_ID ...]
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List
+
+SUBJECTS = [
+    "the neural network", "our startup", "the telescope", "this recipe", "the election",
+    "quantum computing", "the marathon", "climate policy", "the database", "ancient Rome",
+    "the guitar solo", "machine learning", "the supply chain", "renewable energy", "the vaccine",
+]
+VERBS = [
+    "changed", "explains", "depends on", "improves", "breaks", "was inspired by",
+    "competes with", "requires", "measures", "replaced",
+]
+OBJECTS = [
+    "the way we train models", "every small detail", "the final result", "how people think about it",
+    "the original design", "a surprising amount of data", "the budget", "the audience",
+    "the underlying physics", "the next generation",
+]
+FILLERS = ["so", "um", "you know", "basically", "right", "like", "actually"]
+
+
+def make_transcript(minutes: float, seed: int = 7, segment_seconds: float = 4.0, auto_captions: bool = False) -> List[Dict]:
+    """Raw transcript segments ({text, start, duration}) covering the given number of minutes.
+
+    With auto_captions, the noise of YouTube's generated captions is added: each caption
+    repeats the end of the previous one, plus [Music] markers, hesitations and stutters.
+    """
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    previous = ""
+    while start < minutes * 60:
+        words = [rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(OBJECTS)]
+        if rng.random() < 0.3:
+            words.insert(0, rng.choice(FILLERS))
+        text = " ".join(words)
+        if auto_captions:
+            if rng.random() < 0.2:
+                text = f"{rng.choice(['um', 'uh'])} {text}"
+            if rng.random() < 0.1:
+                first = text.split()[0]
+                text = f"{first} {text}"
+            overlap = previous.split()[-rng.randint(2, 4):] if previous else []
+            previous = text
+            text = " ".join(overlap + [text])
+            if rng.random() < 0.05:
+                text = f"[{rng.choice(['Music', 'Applause', 'Laughter'])}] {text}"
+        segments.append({"text": text, "start": round(start, 2), "duration": segment_seconds})
+        start += segment_seconds
+    return segments
+
+
+# Japanese caption lines, which have no spaces between words
+CJK_LINES = [
+    "今日はニューラルネットワークの仕組みについて話します", "このデータベースは予想以上に速くなりました",
+    "望遠鏡で見える星の数は驚くほど多いです", "そのレシピは祖母から教わったものです",
+    "量子コンピュータはまだ研究段階にあります", "選挙の結果は翌朝まで分かりませんでした",
+    "はい", "そうですね", "なるほど", "ええと",
+]
+
+
+def make_short_captions(minutes: float, seed: int = 7, segment_seconds: float = 0.6) -> List[Dict]:
+    """Captions of one or two words each, as in word-by-word live captions"""
+    rng = random.Random(seed)
+    words = " ".join(SUBJECTS + VERBS + OBJECTS).split()
+    segments = []
+    start = 0.0
+    while start < minutes * 60:
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 2)))
+        segments.append({"text": text, "start": round(start, 2), "duration": segment_seconds})
+        start += segment_seconds
+    return segments
+
+
+def make_cjk_transcript(minutes: float, seed: int = 7, segment_seconds: float = 3.0) -> List[Dict]:
+    """Japanese captions, each a single whitespace-separated "word" however long it is"""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    while start < minutes * 60:
+        segments.append({"text": rng.choice(CJK_LINES), "start": round(start, 2), "duration": segment_seconds})
+        start += segment_seconds
+    return segments
+
+
+# Transcript lengths the load test covers by default, from a short clip to a 3 hour stream
+FIXTURE_MINUTES = [1, 10, 30, 60, 120, 180]
+
+
+def load_recorded(directory: str) -> Dict[str, List[Dict]]:
+    """Recorded transcripts keyed by video id, from <video_id>.json files"""
+    transcripts = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                transcripts[name[:-len(".json")]] = json.load(f)
+    return transcripts
+
+
+def record(video_ids: List[str], directory: str):
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    os.makedirs(directory, exist_ok=True)
+    api = YouTubeTranscriptApi()
+    for video_id in video_ids:
+        transcript = api.fetch(video_id).to_raw_data()
+        with open(os.path.join(directory, f"{video_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(transcript, f, ensure_ascii=False)
+        minutes = (transcript[-1]["start"] + transcript[-1].get("duration", 0)) / 60 if transcript else 0
+        print(f"Recorded {video_id}: {len(transcript)} segments, {minutes:.1f} minutes")
+
+
+def make_relationships(count: int = 10, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {"from": rng.choice(SUBJECTS), "rel": rng.choice(VERBS), "to": rng.choice(SUBJECTS)}
+        for _ in range(count)
+    ]
+
+
+QUESTIONS = [
+    "How did quantum computing change the way we train models?",
+    "What does the telescope measure?",
+    "Why does our startup depend on the supply chain?",
+    "What replaced the original design of the database?",
+    "Who was inspired by ancient Rome?",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcript fixtures")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    record_parser = subcommands.add_parser("record", help="fetch real transcripts into JSON fixture files")
+    record_parser.add_argument("video_ids", nargs="+")
+    record_parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded"))
+    args = parser.parse_args()
+    record(args.video_ids, args.out)
@@ -0,0 +1,233 @@
+"""Offline load test: drive the API in process with YouTube, Groq, Neo4j and gTTS replaced by local stand-ins.
+
+Reports p50/p95/p99 latency, throughput, LLM calls and prompt size per request, and peak RSS
+for /process-video and /ask-question at every transcript length, /speech-to-text and /text-to-speech.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --scenario process-video --minutes 1 60 180 --requests 40 --concurrency 8
+    python benchmarks/load_test.py --recorded benchmarks/recorded --groq-latency 1.5 --json results.json
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py reads these at import time; every file it writes goes to a throwaway directory
+_workdir = tempfile.mkdtemp(prefix="vidinsights-load-")
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "fake")
+os.environ.setdefault("CACHE_PATH", os.path.join(_workdir, "cache.db"))
+os.environ.setdefault("TRANSCRIPT_STORE_PATH", os.path.join(_workdir, "transcripts.db"))
+os.environ.setdefault("TTS_CACHE_PATH", os.path.join(_workdir, "tts_cache.db"))
+os.environ.setdefault("SINGLEFLIGHT_LOCK_DIR", os.path.join(_workdir, "locks"))
+
+import httpx  # noqa: E402
+from groq import AsyncGroq  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks import fake_groq, standins  # noqa: E402
+from benchmarks.fixtures import FIXTURE_MINUTES, QUESTIONS, load_recorded, make_transcript  # noqa: E402
+
+SCENARIOS = ["process-video", "ask-question", "speech-to-text", "text-to-speech"]
+_video_ids = itertools.count()
+
+
+def new_video_id() -> str:
+    """A fresh 11 character id, so every request takes the cold path"""
+    return f"lt{next(_video_ids):09d}"
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def install_standins(args):
+    fake_groq.settings["latency"] = args.groq_latency
+    client = AsyncGroq(
+        api_key="fake",
+        base_url="http://fake-groq",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_groq.app), base_url="http://fake-groq"),
+    )
+    main.groq_client = client
+    main.llm.client = client
+
+    standins.FakeTranscriptApi.latency = args.youtube_latency
+    main.YouTubeTranscriptApi = standins.FakeTranscriptApi
+    standins.FakeNeo4jDriver.latency = args.neo4j_latency
+    main.neo4j_driver = standins.FakeNeo4jDriver()
+    standins.FakeGTTS.base_latency = args.tts_latency
+    main.gTTS = standins.FakeGTTS
+
+    async def fake_video_title(video_id: str) -> str:
+        await asyncio.sleep(args.title_latency)
+        return f"Video {video_id}"
+
+    main.get_video_title = fake_video_title
+
+
+async def drive(scenario: str, size: str, send, total: int, concurrency: int) -> dict:
+    """Send `total` requests with at most `concurrency` in flight and summarize the latencies"""
+    latencies, errors = [], 0
+    indexes = iter(range(total))
+    completions, prompt_chars = fake_groq.stats["completions"], fake_groq.stats["prompt_chars"]
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            started = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+                if errors == 1:
+                    print(f"  {scenario} error {response.status_code}: {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": scenario,
+        "size": size,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "llm_calls_per_request": (fake_groq.stats["completions"] - completions) / total,
+        "prompt_chars_per_request": (fake_groq.stats["prompt_chars"] - prompt_chars) / total,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def transcript_fixtures(args):
+    """(label, transcript) pairs: recorded transcripts if given, otherwise synthetic ones per length"""
+    if args.recorded:
+        fixtures = []
+        for video_id, transcript in load_recorded(args.recorded).items():
+            last = transcript[-1] if transcript else {"start": 0}
+            minutes = (last["start"] + last.get("duration", 0)) / 60
+            fixtures.append((f"{video_id} ({minutes:.0f}m)", transcript))
+        return fixtures
+    return [(f"{minutes:g}m", make_transcript(minutes, auto_captions=args.auto_captions)) for minutes in args.minutes]
+
+
+def video_body(video_id: str, args) -> dict:
+    return {
+        "video_url": f"https://www.youtube.com/watch?v={video_id}",
+        "language": args.language,
+        "word_count": 300,
+        "style": "detailed",
+    }
+
+
+async def run(args):
+    install_standins(args)
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=None) as client:
+        for label, transcript in transcript_fixtures(args):
+            if "process-video" in args.scenario:
+                async def send_video(i, transcript=transcript):
+                    video_id = new_video_id()
+                    standins.FakeTranscriptApi.transcripts[video_id] = transcript
+                    return await client.post("/process-video", json=video_body(video_id, args))
+                results.append(await drive("process-video", label, send_video, args.requests, args.concurrency))
+
+            if "ask-question" in args.scenario:
+                # Questions go to one ingested video per transcript length
+                video_id = new_video_id()
+                standins.FakeTranscriptApi.transcripts[video_id] = transcript
+                await client.post("/process-video", json=video_body(video_id, args))
+
+                async def send_question(i, video_id=video_id):
+                    return await client.post("/ask-question", json={
+                        "video_url": f"https://youtu.be/{video_id}",
+                        "question": QUESTIONS[i % len(QUESTIONS)],
+                        "language": args.language,
+                    })
+                results.append(await drive("ask-question", label, send_question, args.requests, args.concurrency))
+
+        if "speech-to-text" in args.scenario:
+            audio = base64.b64encode(random.Random(7).randbytes(args.audio_kb * 1024)).decode()
+
+            async def send_speech(i):
+                return await client.post("/speech-to-text", json={"audio_data": audio, "language": args.language})
+            results.append(await drive("speech-to-text", f"{args.audio_kb}KB", send_speech, args.requests, args.concurrency))
+
+        if "text-to-speech" in args.scenario:
+            async def send_tts(i):
+                # Distinct text per request, so every segment is a cache miss
+                text = ". ".join(segment["text"] for segment in make_transcript(1, seed=1000 + i)[:args.tts_sentences]) + "."
+                return await client.post("/text-to-speech", json={"text": text, "lang": "en"})
+            results.append(await drive("text-to-speech", f"{args.tts_sentences} sentences", send_tts, args.requests, args.concurrency))
+
+    return results
+
+
+def print_results(results):
+    header = (
+        f"{'scenario':<15} {'size':<14} {'reqs':>5} {'conc':>5} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'req/s':>8} {'llm/req':>8} {'prompt/req':>11} {'rss MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['scenario']:<15} {row['size']:<14} {row['requests']:>5} {row['concurrency']:>5} {row['errors']:>5} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['throughput_rps']:>8.2f} "
+            f"{row['llm_calls_per_request']:>8.1f} {row['prompt_chars_per_request']:>11.0f} {row['peak_rss_mb']:>8.1f}"
+        )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--minutes", type=float, nargs="+", default=FIXTURE_MINUTES, help="synthetic transcript lengths")
+    parser.add_argument("--recorded", help="directory of recorded <video_id>.json transcripts to use instead")
+    parser.add_argument("--auto-captions", action="store_true", help="add the overlaps and markers of generated captions")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario and size")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--language", default="english")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="seconds per fake chat completion")
+    parser.add_argument("--youtube-latency", type=float, default=0.3, help="seconds per fake transcript fetch")
+    parser.add_argument("--title-latency", type=float, default=0.1, help="seconds per fake oEmbed title lookup")
+    parser.add_argument("--neo4j-latency", type=float, default=0.01, help="seconds per fake Neo4j query")
+    parser.add_argument("--tts-latency", type=float, default=0.1, help="base seconds per fake gTTS segment")
+    parser.add_argument("--audio-kb", type=int, default=256, help="size of the fake speech recording")
+    parser.add_argument("--tts-sentences", type=int, default=10, help="sentences per text-to-speech request")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
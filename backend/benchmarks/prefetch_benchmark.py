@@ -0,0 +1,134 @@
+"""Bulk prefetch of titles and transcripts against local stand-ins: per-request fetching vs. the pooled fetch layer.
+
+Titles come from benchmarks/fake_youtube.py, served over real TCP on a local port so new
+connections (and their stand-in handshake delay) are counted; transcripts come from the
+FakeTranscriptApi stand-in. A second /prefetch of the same videos must not reach either
+stand-in again, which checks that missing titles and transcripts are negatively cached.
+
+Usage (from the backend directory):
+    python benchmarks/prefetch_benchmark.py --videos 100
+    python benchmarks/prefetch_benchmark.py --videos 300 --missing 0.2 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+workdir = tempfile.mkdtemp(prefix="vidinsights-prefetch-")
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "")
+for name, filename in [
+    ("CACHE_PATH", "cache.db"),
+    ("TRANSCRIPT_STORE_PATH", "transcripts.db"),
+    ("TTS_CACHE_PATH", "tts_cache.db"),
+    ("INGEST_DB_PATH", "ingest.db"),
+    ("SINGLEFLIGHT_LOCK_DIR", "locks"),
+]:
+    os.environ.setdefault(name, os.path.join(workdir, filename))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks import fake_youtube, standins  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_youtube(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(fake_youtube.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def video_ids(count: int, missing: float):
+    missing_count = int(count * missing)
+    return [f"missing{i:04d}" for i in range(missing_count)] + [f"bench{i:06d}" for i in range(count - missing_count)]
+
+
+async def per_request(ids, oembed_url: str):
+    """What each request did before the fetch layer: a new connection per title, a new client per transcript"""
+    for video_id in ids:
+        async with httpx.AsyncClient(timeout=10) as client:
+            await client.get(oembed_url, params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"})
+        try:
+            await main.run_blocking(lambda: standins.FakeTranscriptApi().fetch(video_id).to_raw_data())
+        except standins.TranscriptsDisabled:
+            pass
+
+
+async def measure(label: str, coro):
+    fake_youtube.reset()
+    fetches = standins.FakeTranscriptApi.fetches
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<22} {elapsed:>8.2f} s {fake_youtube.stats['connections']:>6} conn "
+        f"{fake_youtube.stats['requests']:>6} titles {standins.FakeTranscriptApi.fetches - fetches:>6} transcripts"
+    )
+    return result
+
+
+async def run(args):
+    port = free_port()
+    server = start_fake_youtube(port)
+    fake_youtube.settings.update(latency=args.title_latency, handshake=args.handshake)
+    main.YOUTUBE_OEMBED_URL = f"http://127.0.0.1:{port}/oembed"
+    main.YouTubeTranscriptApi = standins.FakeTranscriptApi
+    standins.FakeTranscriptApi.latency = args.transcript_latency
+    main.youtube_pool = main.FetchPool(args.concurrency, args.requests_per_second)
+
+    ids = video_ids(args.videos, args.missing)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=600) as client:
+        print(f"{len(ids)} videos, {int(len(ids) * args.missing)} without a transcript or title")
+        await measure("per request (serial)", per_request(ids, main.YOUTUBE_OEMBED_URL))
+
+        async def prefetch():
+            response = await client.post("/prefetch", json={"video_ids": ids})
+            response.raise_for_status()
+            return response.json()
+
+        first = await measure("/prefetch", prefetch())
+        print(f"  transcripts: {first['transcripts']}")
+        await measure("/prefetch again", prefetch())
+        if fake_youtube.stats["requests"] or fake_youtube.stats["connections"]:
+            raise SystemExit("The repeated prefetch reached the oEmbed stand-in; titles are not cached")
+
+        fetches = standins.FakeTranscriptApi.fetches
+        await prefetch()
+        if standins.FakeTranscriptApi.fetches != fetches:
+            raise SystemExit("The repeated prefetch fetched transcripts again; missing ones are not negatively cached")
+
+    server.should_exit = True
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=100)
+    parser.add_argument("--missing", type=float, default=0.1, help="share of videos without a transcript or title")
+    parser.add_argument("--concurrency", type=int, default=main.YOUTUBE_MAX_CONCURRENCY)
+    parser.add_argument("--requests-per-second", type=float, default=0.0)
+    parser.add_argument("--title-latency", type=float, default=0.05)
+    parser.add_argument("--handshake", type=float, default=0.05, help="stand-in TLS handshake per new connection")
+    parser.add_argument("--transcript-latency", type=float, default=0.1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
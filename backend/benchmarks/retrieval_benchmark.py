@@ -0,0 +1,94 @@
+"""Compare /ask-question prompt size and answer latency: full transcript vs. retrieval index.
+
+Usage (from the backend directory):
+    python benchmarks/retrieval_benchmark.py --minutes 10 60 180
+    python benchmarks/retrieval_benchmark.py --minutes 60 --live   # also time real Groq answers
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py validates these at import time; the benchmark never talks to Neo4j
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "")
+os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "benchmark-cache.db"))
+
+import main  # noqa: E402
+from retrieval import TranscriptIndex, rank_triples  # noqa: E402
+from benchmarks.fixtures import QUESTIONS, make_relationships, make_transcript  # noqa: E402
+
+
+def relationships_text(relationships):
+    return "\n".join(f"- {rel['from']} {rel['rel']} {rel['to']}" for rel in relationships)
+
+
+def full_prompt(question, transcript_text, relationships):
+    return main.build_answer_prompt(question, relationships_text(relationships), transcript_text, "Full transcript")
+
+
+def retrieval_prompt(question, index, relationships):
+    context = main.format_excerpts(index.search(question, main.RETRIEVAL_TOP_K))
+    relevant = rank_triples(relationships, question, main.RETRIEVAL_MAX_TRIPLES, context)
+    return main.build_answer_prompt(question, relationships_text(relevant), context)
+
+
+async def timed_answer(prompt):
+    started = time.perf_counter()
+    await main.llm.create(
+        messages=[{"role": "user", "content": prompt}],
+        model=main.GROQ_MODEL,
+        temperature=0.5,
+    )
+    return time.perf_counter() - started
+
+
+async def run(minutes_list, live):
+    relationships = make_relationships(40)
+    print(f"{'minutes':>8} {'path':>10} {'prompt chars':>13} {'~tokens':>8} {'build ms':>9} {'answer s':>9}")
+    for minutes in minutes_list:
+        transcript_data = make_transcript(minutes)
+        transcript_text = main.TextFormatter().format_transcript(transcript_data)
+
+        started = time.perf_counter()
+        index = TranscriptIndex.from_transcript(transcript_data, main.RETRIEVAL_SEGMENT_CHARS)
+        index_ms = (time.perf_counter() - started) * 1000
+
+        for path in ("full", "retrieval"):
+            sizes, build_times, answer_times = [], [], []
+            for question in QUESTIONS:
+                started = time.perf_counter()
+                if path == "full":
+                    prompt = full_prompt(question, transcript_text, relationships)
+                else:
+                    prompt = retrieval_prompt(question, index, relationships)
+                build_times.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(prompt))
+                if live:
+                    answer_times.append(await timed_answer(prompt))
+
+            chars = statistics.mean(sizes)
+            answer = f"{statistics.median(answer_times):9.2f}" if answer_times else f"{'-':>9}"
+            print(f"{minutes:>8g} {path:>10} {chars:>13.0f} {chars / 4:>8.0f} {statistics.mean(build_times):>9.2f} {answer}")
+        print(f"{'':>8} {'index':>10} built once in {index_ms:.1f} ms ({len(index.segments)} segments)")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 60, 180])
+    parser.add_argument("--live", action="store_true", help="send both prompts to Groq and time the answers")
+    args = parser.parse_args()
+    if args.live and not os.getenv("GROQ_API_KEY"):
+        parser.error("--live needs GROQ_API_KEY")
+    asyncio.run(run(args.minutes, args.live))
+
+
+if __name__ == "__main__":
+    main_cli()
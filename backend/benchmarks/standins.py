@@ -0,0 +1,215 @@
+"""Latency-injecting local stand-ins for YouTube, Neo4j and gTTS, used by the load test.
+
+Groq is replaced by benchmarks/fake_groq.py, mounted in process through an ASGI transport.
+"""
+import asyncio
+import math
+import time
+import zlib
+from typing import Dict, List, Set
+
+from benchmarks.fixtures import make_transcript
+
+
+class TranscriptsDisabled(Exception):
+    """Same name as the youtube_transcript_api error, which is how main.py recognises it"""
+
+
+class FakeTranscriptApi:
+    """Drop-in for YouTubeTranscriptApi; transcripts come from `transcripts` or a synthetic fixture.
+
+    Video IDs starting with "missing" have no transcript, like videos with captions disabled.
+    """
+
+    latency = 0.3
+    transcripts: Dict[str, List[Dict]] = {}
+    default_minutes = 10.0
+    fetches = 0
+
+    def __init__(self, http_client=None):
+        self.http_client = http_client
+
+    def fetch(self, video_id: str):
+        FakeTranscriptApi.fetches += 1
+        # Runs on the blocking pool in main.py, so a blocking sleep is the realistic stand-in
+        time.sleep(self.latency)
+        if video_id.startswith("missing"):
+            raise TranscriptsDisabled(f"Subtitles are disabled for this video ({video_id})")
+        transcript = self.transcripts.get(video_id) or make_transcript(self.default_minutes, seed=zlib.crc32(video_id.encode()))
+        return _Fetched(transcript)
+
+
+class _Fetched:
+    def __init__(self, transcript: List[Dict]):
+        self._transcript = transcript
+
+    def to_raw_data(self) -> List[Dict]:
+        return [dict(segment) for segment in self._transcript]
+
+
+class FakeGTTS:
+    """Drop-in for gTTS; synthesis time grows with the text length like the real service"""
+
+    latency_per_char = 0.0005
+    base_latency = 0.1
+
+    def __init__(self, text: str, lang: str = "en", slow: bool = False):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(self.base_latency + self.latency_per_char * len(self.text))
+        # Roughly the bitrate of gTTS output: about 1 KB of MP3 per 15 characters
+        fp.write(b"\xff\xf3" + b"\x00" * (len(self.text) * 70))
+
+
+class _Result:
+    def __init__(self, records: List[Dict]):
+        self._records = records
+
+    async def single(self):
+        return self._records[0] if self._records else None
+
+    async def consume(self):
+        return None
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+class FakeNeo4jDriver:
+    """In-memory graph that answers the handful of Cypher statements main.py and entity_index.py issue"""
+
+    latency = 0.02
+
+    def __init__(self):
+        self.graphs: Dict[str, List[Dict]] = {}
+        self.queries = 0
+        # Merged entity nodes, as MERGE on Entity.name leaves them
+        self.normalized: Dict[str, str] = {}
+        self.edges: Dict[str, List[Dict]] = {}
+        self.mentions: Dict[str, Set[str]] = {}
+
+    def write(self, video_id: str, triples: List[Dict]):
+        self.graphs[video_id] = list(triples)
+        for t in triples:
+            for name, key in ((t["entity1"], "normalized1"), (t["entity2"], "normalized2")):
+                self.normalized[name] = t.get(key, self.normalized.get(name))
+                self.mentions.setdefault(name, set()).add(video_id)
+            edge = {"relationship": t["relationship"], "from": t["entity1"], "to": t["entity2"]}
+            for name in {t["entity1"], t["entity2"]}:
+                if edge not in self.edges.setdefault(name, []):
+                    self.edges[name].append(edge)
+
+    def session(self):
+        return _Session(self)
+
+    async def close(self):
+        pass
+
+
+class _Session:
+    def __init__(self, driver: FakeNeo4jDriver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query: str, **params):
+        self.driver.queries += 1
+        await asyncio.sleep(self.driver.latency)
+        graphs = self.driver.graphs
+        video_id = params.get("video_id")
+
+        if "UNWIND $triples" in query:
+            self.driver.write(video_id, params["triples"])
+            return _Result([])
+        if "db.index.fulltext.queryNodes" in query:
+            return _Result(self._fulltext(params["search"], params["limit"]))
+        if "e.normalized_name = $key" in query:
+            return _Result([{"name": name} for name, key in self.driver.normalized.items() if key == params["key"]])
+        if "e.normalized_name IS NULL" in query:
+            return _Result([{"name": name} for name, key in self.driver.normalized.items() if key is None][:params["batch_size"]])
+        if "SET e.normalized_name = entity.normalized_name" in query:
+            for entity in params["entities"]:
+                self.driver.normalized[entity["name"]] = entity["normalized_name"]
+            return _Result([])
+        if "MATCH (e)-[r:RELATES_TO]-(other:Entity)" in query:
+            return _Result(self._neighbours(params["names"], params["max_edges"]))
+        if "AS matched" in query:
+            return _Result(self._entity_videos(params["names"], params["offset"], params["limit"]))
+        if "AS shared" in query:
+            return _Result(self._related_videos(video_id, params["hub_max_videos"], params["limit"]))
+        if "RETURN v.video_id LIMIT 1" in query:
+            return _Result([{"v.video_id": video_id}] if video_id in graphs else [])
+        if "collect(DISTINCT {from" in query:
+            if video_id not in graphs:
+                return _Result([])
+            relationships = [
+                {"from": t["entity1"], "rel": t["relationship"], "to": t["entity2"]} for t in graphs[video_id]
+            ]
+            return _Result([{"relationships": relationships}])
+        if "legacy_transcript" in query:
+            if video_id not in graphs:
+                return _Result([])
+            entities = sorted({t["entity1"] for t in graphs[video_id]} | {t["entity2"] for t in graphs[video_id]})
+            return _Result([{"legacy_transcript": None, "entities": entities}])
+        if "r.type as relationship" in query:
+            return _Result([
+                {"from": t["entity1"], "relationship": t["relationship"], "to": t["entity2"]}
+                for t in graphs.get(video_id, [])
+            ])
+        if "RETURN v.transcript as transcript" in query:
+            return _Result([{"transcript": None}])
+        # RETURN 1, schema statements and anything else
+        return _Result([{"1": 1}])
+
+    def _fulltext(self, query: str, limit: int) -> List[Dict]:
+        # Every term must occur in the name, the one ending in * as a prefix; shorter names score higher
+        terms = [term.rstrip("*") for term in query.split(" AND ")]
+        matches = []
+        for name, key in self.driver.normalized.items():
+            words = (key or name.lower()).split()
+            found = all(term in words for term in terms[:-1]) and any(word.startswith(terms[-1]) for word in words)
+            if found:
+                matches.append({"name": name, "score": len(terms) / len(words)})
+        return sorted(matches, key=lambda match: (-match["score"], match["name"]))[:limit]
+
+    def _neighbours(self, names: List[str], max_edges: int) -> List[Dict]:
+        records = []
+        for name in names:
+            for edge in self.driver.edges.get(name, [])[:max_edges]:
+                outgoing = edge["from"] == name
+                other = edge["to"] if outgoing else edge["from"]
+                records.append({"entity": name, "relationship": edge["relationship"], "other": other, "outgoing": outgoing})
+        return records
+
+    def _entity_videos(self, names: List[str], offset: int, limit: int) -> List[Dict]:
+        videos: Dict[str, List[str]] = {}
+        for name in names:
+            for video_id in self.driver.mentions.get(name, ()):
+                videos.setdefault(video_id, []).append(name)
+        return [{"video_id": video_id, "matched": videos[video_id]} for video_id in sorted(videos)[offset:offset + limit]]
+
+    def _related_videos(self, video_id: str, hub_max_videos: int, limit: int) -> List[Dict]:
+        related: Dict[str, Dict] = {}
+        for name, video_ids in self.driver.mentions.items():
+            if video_id not in video_ids or not 1 < len(video_ids) <= hub_max_videos:
+                continue
+            for other in video_ids - {video_id}:
+                entry = related.setdefault(other, {"video_id": other, "shared": [], "score": 0.0})
+                entry["shared"].append(name)
+                entry["score"] += 1.0 / math.log(1 + len(video_ids))
+        return sorted(related.values(), key=lambda entry: (-entry["score"], entry["video_id"]))[:limit]
+
+    async def execute_write(self, transaction_function, *args, **kwargs):
+        return await transaction_function(self, *args, **kwargs)
+
+    async def execute_read(self, transaction_function, *args, **kwargs):
+        return await transaction_function(self, *args, **kwargs)
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+def make_cache_key(*parts) -> str:
+    """Build a stable content-addressed key from the given parts"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier cache: a small in-process LRU in front of a SQLite table on local disk.
+
+    Values must be JSON serialisable or raw bytes. Entries expire after `ttl_seconds`, and the
+    disk tier is trimmed to `max_entries` / `max_bytes` by least recent access.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_entries: int = 512,
+        touch_interval: float = 60.0,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        # A disk hit refreshes accessed_at at most this often
+        self.touch_interval = touch_interval
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several uvicorn workers share the same cache file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._setup()
+
+    def _setup(self):
+        with self._lock:
+            # IMMEDIATE so workers opening the same file at once set it up one at a time
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # size before value, so reading sizes never touches the value's overflow pages
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cache (
+                        key TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        expires_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL,
+                        raw INTEGER NOT NULL DEFAULT 0,
+                        value BLOB NOT NULL
+                    )
+                """)
+                self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+                # Running entry count and byte total, kept by triggers so every worker sharing the
+                # file sees the same numbers without scanning the table on each write
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cache_stats (
+                        id INTEGER PRIMARY KEY CHECK (id = 0),
+                        entries INTEGER NOT NULL,
+                        bytes INTEGER NOT NULL
+                    )
+                """)
+                self._conn.execute("""
+                    INSERT OR IGNORE INTO cache_stats (id, entries, bytes)
+                    SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache
+                """)
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS cache_stats_insert AFTER INSERT ON cache BEGIN
+                        UPDATE cache_stats SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+                    END
+                """)
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS cache_stats_delete AFTER DELETE ON cache BEGIN
+                        UPDATE cache_stats SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+                    END
+                """)
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS cache_stats_update AFTER UPDATE OF size ON cache BEGIN
+                        UPDATE cache_stats SET bytes = bytes + NEW.size - OLD.size WHERE id = 0;
+                    END
+                """)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Value from the in-process tier only, so callers on the event loop can skip the disk"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            self._memory.move_to_end(key)
+            return entry[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at, raw, accessed_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            # Recency only needs to be roughly right for eviction, so most reads skip the write
+            if now - row[3] > self.touch_interval:
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            value = bytes(row[0]) if row[2] else json.loads(row[0])
+            self._remember(key, row[1], value)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        raw = isinstance(value, bytes)
+        blob = value if raw else json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO cache (key, size, expires_at, accessed_at, raw, value) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    size = excluded.size, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at,
+                    raw = excluded.raw, value = excluded.value
+            """, (key, len(blob), expires_at, now, int(raw), blob))
+            self._remember(key, expires_at, value)
+            self._evict(now)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def stats(self) -> Tuple[int, int]:
+        """(entries, bytes) on disk"""
+        with self._lock:
+            return self._totals()
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute("SELECT entries, bytes FROM cache_stats WHERE id = 0").fetchone()
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        count, total = self._totals()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Expired rows go first; reads drop them lazily otherwise
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        count, total = self._totals()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Drop least recently used rows until both limits are satisfied
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append(key)
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            self._memory.pop(key, None)
@@ -0,0 +1,147 @@
+import html
+import re
+from typing import Dict, List
+
+# Bump when the rules change, so cached compacted transcripts are rebuilt
+COMPACTION_VERSION = 3
+
+# [Music], [Applause], [ __ ] (bleeped words), ♪ lyrics markers and >> speaker changes
+NON_SPEECH = re.compile(
+    r"\[[^\]]*\]|\((?:music|applause|laughter|laughs|inaudible|silence|cheering|crosstalk)[^)]*\)|[♪♫]+|>>",
+    re.IGNORECASE,
+)
+# Hesitation sounds only; words such as "like" or "so" carry meaning too often to drop
+FILLERS = re.compile(r"\b(?:u+m+|u+h+|e+r+m+|mhm|hmm+)\b[,.]?", re.IGNORECASE)
+# A word or a phrase of up to four words said three times or more in a row: "no no no", "I think I think I think".
+# Doubles are often meant ("had had", "that that", "bye bye"), so only STUTTERS collapse from two.
+REPEATS = re.compile(r"\b((?:\w+[\s,]+){0,3}\w+)(?:[\s,]+\1\b){2,}", re.IGNORECASE)
+# Short function words a speaker restarts on: "the the", "I I", "and and"
+STUTTERS = re.compile(r"\b(i|a|an|the|and|but|of|to|we|my)(?:[\s,]+\1\b)+", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([,.!?;:])")
+
+# Longest run of words checked for a caption repeating the end of the previous one
+MAX_OVERLAP_WORDS = 30
+# Captions left with fewer estimated tokens than this are folded into the previous segment. Tokens
+# rather than words, as scripts written without spaces (Japanese, Chinese, Thai) give one "word" per caption.
+MIN_SEGMENT_TOKENS = 3
+# Folding stops once a segment would span more than this many seconds or characters, so timestamps
+# stay close to what is said and a run of short captions never collapses into one segment
+MAX_MERGED_SECONDS = 20
+MAX_MERGED_CHARS = 400
+# Trailing words re-cleaned with each folded caption, enough for a phrase said three times across the join
+JOIN_WORDS = 12
+
+TOKEN_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate of the LLM token count, close enough to size prompts without a tokenizer.
+
+    Common English words are one token and long ones a few; punctuation is one token each;
+    non-Latin scripts split into many more tokens per character.
+    """
+    tokens = 0
+    for piece in TOKEN_PIECES.findall(text):
+        if piece.isascii():
+            tokens += 1 + max(0, len(piece) - 6) // 4
+        else:
+            tokens += 1 + len(piece) // 2
+    return tokens
+
+
+def clean_text(text: str) -> str:
+    """Caption text without markup, non-speech markers, hesitations, stutters or extra whitespace"""
+    text = html.unescape(text)
+    text = NON_SPEECH.sub(" ", text)
+    text = FILLERS.sub(" ", text)
+    text = WHITESPACE.sub(" ", text)
+    text = REPEATS.sub(r"\1", text)
+    text = STUTTERS.sub(r"\1", text)
+    text = SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+    return text.strip(" ,")
+
+
+def _comparable(word: str) -> str:
+    return word.lower().strip(".,!?;:\"'")
+
+
+def _overlap(previous: List[str], current: List[str]) -> int:
+    """Number of leading words of current that repeat the end of previous (rolling auto-captions)"""
+    previous = [_comparable(word) for word in previous[-MAX_OVERLAP_WORDS:]]
+    current = [_comparable(word) for word in current[:MAX_OVERLAP_WORDS]]
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[-size:] == current[:size]:
+            # A single shared word is usually a coincidence, unless it is all the caption says
+            if size >= 2 or size == len(current):
+                return size
+            break
+    return 0
+
+
+def _end(segment: Dict):
+    if segment.get("start") is None:
+        return None
+    return segment["start"] + segment.get("duration", 0)
+
+
+def _extend(segment: Dict, other: Dict):
+    """Make segment cover other's time span as well"""
+    end, other_end = _end(segment), _end(other)
+    if end is not None and other_end is not None:
+        segment["duration"] = round(max(end, other_end) - segment["start"], 3)
+
+
+def _can_absorb(segment: Dict, other: Dict, text: str) -> bool:
+    """Whether segment stays within MAX_MERGED_SECONDS / MAX_MERGED_CHARS once it also covers other"""
+    if text and len(segment["text"]) + len(text) + 1 > MAX_MERGED_CHARS:
+        return False
+    other_end = _end(other)
+    return segment.get("start") is None or other_end is None or other_end - segment["start"] <= MAX_MERGED_SECONDS
+
+
+def compact_transcript(transcript_data: List[Dict]) -> List[Dict]:
+    """Segments with caption noise removed, keeping each one's original start and covering span.
+
+    Markers and hesitations are stripped, words a caption repeats from the previous one are
+    dropped, and captions left empty or nearly so are merged into the previous segment, up to
+    MAX_MERGED_SECONDS / MAX_MERGED_CHARS. The same input always gives the same output.
+    """
+    compacted: List[Dict] = []
+    for entry in transcript_data:
+        words = clean_text(entry.get("text") or "").split()
+        segment = {key: entry[key] for key in ("start", "duration") if key in entry}
+        if compacted:
+            previous = compacted[-1]
+            previous_words = previous["text"].split()
+            words = words[_overlap(previous_words, words):]
+            text = " ".join(words)
+            if not words:
+                # Nothing new was said; the previous segment covers this caption's time while it can
+                if _can_absorb(previous, segment, text):
+                    _extend(previous, segment)
+                continue
+            if estimate_tokens(text) < MIN_SEGMENT_TOKENS and _can_absorb(previous, segment, text):
+                # Only the join is cleaned again, for stutters split across the two captions
+                joined = clean_text(" ".join(previous_words[-JOIN_WORDS:] + words))
+                previous["text"] = " ".join(previous_words[:-JOIN_WORDS] + [joined])
+                _extend(previous, segment)
+                continue
+        if not words:
+            continue
+        segment["text"] = " ".join(words)
+        compacted.append(segment)
+    return compacted
+
+
+def compaction_stats(transcript_data: List[Dict], compacted: List[Dict]) -> Dict:
+    raw_text = " ".join(entry.get("text") or "" for entry in transcript_data)
+    compacted_text = " ".join(segment["text"] for segment in compacted)
+    return {
+        "segments": len(transcript_data),
+        "compacted_segments": len(compacted),
+        "chars": len(raw_text),
+        "compacted_chars": len(compacted_text),
+        "tokens": estimate_tokens(raw_text),
+        "compacted_tokens": estimate_tokens(compacted_text),
+    }
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from telemetry import timer, NEO4J_QUERY_SECONDS
+from timestamp_index import fold
+
+LEADING_ARTICLE = re.compile(r"^(?:the|a|an) ")
+
+# Lookup index for exact (normalized) entity matches, full-text index for partial names
+ENTITY_SCHEMA = [
+    "CREATE INDEX entity_normalized_name_index IF NOT EXISTS FOR (e:Entity) ON (e.normalized_name)",
+    "CREATE FULLTEXT INDEX entity_name_fulltext IF NOT EXISTS FOR (e:Entity) ON EACH [e.name, e.normalized_name]",
+]
+FULLTEXT_INDEX = "entity_name_fulltext"
+
+
+def normalize_entity_name(name: str) -> str:
+    """Key shared by spellings of the same entity, e.g. "The Moon", "moon" and "Moon." """
+    return LEADING_ARTICLE.sub("", fold(name or ""))
+
+
+def fulltext_query(text: str) -> Optional[str]:
+    """Lucene query matching every word of text, the last one as a prefix (for search-as-you-type)"""
+    terms = normalize_entity_name(text).split()
+    if not terms:
+        return None
+    # fold() leaves only word characters, so nothing needs escaping
+    return " AND ".join(terms[:-1] + [terms[-1] + "*"])
+
+
+class EntityIndex:
+    """Cross-video queries over the Entity nodes every video's graph is merged into.
+
+    An entity query is resolved to the Entity nodes sharing its normalized name (falling
+    back to the full-text index), then answered from those nodes. Each entity's immediate
+    neighbourhood is cached, so multi-hop expansion around popular entities mostly runs
+    in memory, and only the entities at the edge of the cached area are read from Neo4j.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable,
+        cache_size: int = 4096,
+        ttl_seconds: float = 300.0,
+        max_edges: int = 100,
+        max_frontier: int = 200,
+        max_matches: int = 5,
+        hub_max_videos: int = 500,
+    ):
+        self.driver_factory = driver_factory
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        # Edges read per entity and entities expanded per hop, so hubs cannot blow up a query
+        self.max_edges = max_edges
+        self.max_frontier = max_frontier
+        # Entity nodes a full-text fallback may resolve one name to
+        self.max_matches = max_matches
+        # Entities in more videos than this say little about how two videos relate
+        self.hub_max_videos = hub_max_videos
+        self._cache: "OrderedDict[Tuple, Tuple[float, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple):
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._cache.pop(key, None)
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _put(self, key: Tuple, value):
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, names: List[str]):
+        """Forget cached lookups and neighbourhoods of entities a graph write just touched"""
+        subjects = set(names) | {normalize_entity_name(name) for name in names}
+        for key in [key for key in self._cache if key[1] in subjects]:
+            del self._cache[key]
+
+    async def _query(self, label: str, cypher: str, **params) -> List[Dict]:
+        async with self.driver_factory().session() as session:
+            with timer(NEO4J_QUERY_SECONDS, query=label):
+                result = await session.run(cypher, **params)
+                return [dict(record) async for record in result]
+
+    async def search(self, text: str, limit: int = 10) -> List[Dict]:
+        """Entities whose name contains every word of text, best match first"""
+        query = fulltext_query(text)
+        if query is None:
+            return []
+        records = await self._query("entity_search", """
+            CALL db.index.fulltext.queryNodes($index, $search) YIELD node, score
+            RETURN node.name AS name, score
+            LIMIT $limit
+        """, index=FULLTEXT_INDEX, search=query, limit=limit)
+        return [{"name": record["name"], "score": record["score"]} for record in records]
+
+    async def resolve(self, name: str) -> List[str]:
+        """Names of the Entity nodes a queried name refers to; empty when none match"""
+        key = normalize_entity_name(name)
+        if not key:
+            return []
+        cached = self._get(("resolve", key))
+        if cached is not None:
+            return cached
+
+        records = await self._query("entity_lookup", """
+            MATCH (e:Entity) WHERE e.normalized_name = $key
+            RETURN e.name AS name
+        """, key=key)
+        names = sorted(record["name"] for record in records)
+        if not names:
+            # Partial names, and entities written before normalized_name existed
+            names = [match["name"] for match in await self.search(name, self.max_matches)]
+        self._put(("resolve", key), names)
+        return names
+
+    async def neighbours(self, names: List[str]) -> Dict[str, List[Tuple[str, str, bool]]]:
+        """(relationship, other entity, outgoing) edges of each entity, from the cache or one query"""
+        adjacency, missing = {}, []
+        for name in names:
+            cached = self._get(("neighbours", name))
+            if cached is None:
+                missing.append(name)
+            else:
+                adjacency[name] = cached
+
+        if missing:
+            fetched = {name: [] for name in missing}
+            records = await self._query("entity_neighbours", """
+                UNWIND $names AS name
+                MATCH (e:Entity {name: name})
+                CALL {
+                    WITH e
+                    MATCH (e)-[r:RELATES_TO]-(other:Entity)
+                    RETURN r.type AS relationship, other.name AS other, startNode(r) = e AS outgoing
+                    LIMIT $max_edges
+                }
+                RETURN name AS entity, relationship, other, outgoing
+            """, names=missing, max_edges=self.max_edges)
+            for record in records:
+                fetched[record["entity"]].append((record["relationship"], record["other"], record["outgoing"]))
+            for name, edges in fetched.items():
+                self._put(("neighbours", name), edges)
+            adjacency.update(fetched)
+        return adjacency
+
+    async def related_entities(self, name: str, hops: int = 2, limit: int = 25) -> Optional[List[Dict]]:
+        """Entities within hops relationships of the named one, nearest and best connected first.
+
+        None when the name matches no entity.
+        """
+        names = await self.resolve(name)
+        if not names:
+            return None
+
+        found: Dict[str, Dict] = {}
+        seen = set(names)
+        frontier = names
+        for distance in range(1, hops + 1):
+            adjacency = await self.neighbours(frontier)
+            layer: Dict[str, Dict] = {}
+            for source in frontier:
+                for relationship, other, outgoing in adjacency.get(source, []):
+                    if other in seen:
+                        continue
+                    entry = layer.setdefault(other, {
+                        "name": other,
+                        "distance": distance,
+                        "via": source,
+                        "relationship": relationship,
+                        "direction": "out" if outgoing else "in",
+                        "links": 0,
+                    })
+                    entry["links"] += 1
+            seen.update(layer)
+            found.update(layer)
+            # Expand the best connected entities first when the next hop has to be cut
+            ranked = sorted(layer.values(), key=lambda entry: (-entry["links"], entry["name"]))
+            frontier = [entry["name"] for entry in ranked[:self.max_frontier]]
+            if not frontier:
+                break
+
+        ranked = sorted(found.values(), key=lambda entry: (entry["distance"], -entry["links"], entry["name"]))
+        return ranked[:limit]
+
+    async def videos_for_entity(self, name: str, limit: int = 20, offset: int = 0) -> Optional[Dict]:
+        """Videos mentioning the named entity, None when the name matches no entity"""
+        names = await self.resolve(name)
+        if not names:
+            return None
+        key = ("videos", normalize_entity_name(name), limit, offset)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        records = await self._query("entity_videos", """
+            MATCH (e:Entity) WHERE e.name IN $names
+            MATCH (v:Video)-[:HAS_ENTITY]->(e)
+            WITH v, collect(e.name) AS matched
+            RETURN v.video_id AS video_id, matched
+            ORDER BY video_id
+            SKIP $offset LIMIT $limit
+        """, names=names, offset=offset, limit=limit)
+        result = {
+            "entities": names,
+            "videos": [{"video_id": record["video_id"], "entities": record["matched"]} for record in records],
+        }
+        self._put(key, result)
+        return result
+
+    async def related_videos(self, video_id: str, limit: int = 10) -> List[Dict]:
+        """Other videos ranked by the entities they share with this one, rarer entities counting more"""
+        key = ("related_videos", video_id, limit)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        records = await self._query("related_videos", """
+            MATCH (:Video {video_id: $video_id})-[:HAS_ENTITY]->(e:Entity)
+            WITH e, COUNT { (e)<-[:HAS_ENTITY]-() } AS mentions
+            WHERE mentions > 1 AND mentions <= $hub_max_videos
+            MATCH (e)<-[:HAS_ENTITY]-(other:Video)
+            WHERE other.video_id <> $video_id
+            WITH other, collect(e.name) AS shared, sum(1.0 / log(1 + mentions)) AS score
+            RETURN other.video_id AS video_id, shared, score
+            ORDER BY score DESC, video_id
+            LIMIT $limit
+        """, video_id=video_id, hub_max_videos=self.hub_max_videos, limit=limit)
+        result = [
+            {"video_id": record["video_id"], "shared_entities": sorted(record["shared"]), "score": round(record["score"], 4)}
+            for record in records
+        ]
+        self._put(key, result)
+        return result
+
+    def metrics(self) -> Dict:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+async def backfill_normalized_names(driver, batch_size: int = 1000) -> int:
+    """Set normalized_name on Entity nodes written before it existed"""
+    updated = 0
+    while True:
+        async with driver.session() as session:
+            result = await session.run("""
+                MATCH (e:Entity) WHERE e.normalized_name IS NULL AND e.name IS NOT NULL
+                RETURN e.name AS name
+                LIMIT $batch_size
+            """, batch_size=batch_size)
+            names = [record["name"] async for record in result]
+            if not names:
+                return updated
+
+            result = await session.run("""
+                UNWIND $entities AS entity
+                MATCH (e:Entity {name: entity.name})
+                SET e.normalized_name = entity.normalized_name
+            """, entities=[{"name": name, "normalized_name": normalize_entity_name(name)} for name in names])
+            await result.consume()
+        updated += len(names)
+        print(f"Normalized {updated} entity names")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entity index maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill = subcommands.add_parser("backfill", help="set normalized_name on existing Entity nodes")
+    backfill.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from neo4j import AsyncGraphDatabase
+
+    load_dotenv()
+
+    async def run_backfill():
+        driver = AsyncGraphDatabase.driver(
+            os.getenv("NEO4J_URI"),
+            auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+        )
+        try:
+            total = await backfill_normalized_names(driver, args.batch_size)
+            print(f"Done, {total} entity names normalized")
+        finally:
+            await driver.close()
+
+    asyncio.run(run_backfill())
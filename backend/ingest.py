@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Item states: pending -> running -> done | skipped | failed (running again after a crash or error)
+FINISHED_STATES = ("done", "skipped", "failed")
+
+
+class IngestStore:
+    """Batch ingestion jobs and per-URL progress in SQLite, so a restarted job resumes where it stopped.
+
+    A running item holds a lease; if its worker dies the item is claimed again once the lease expires.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                job_id TEXT PRIMARY KEY,
+                options TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                claimed_at REAL,
+                finished_at REAL,
+                PRIMARY KEY (job_id, position)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ingest_items_status ON ingest_items (job_id, status)")
+
+    def create_job(self, job_id: str, urls: List[str], options: Dict) -> bool:
+        """Register a job; returns False if a job with this id already exists (it is then resumed as is)"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                created = self._conn.execute(
+                    "INSERT OR IGNORE INTO ingest_jobs (job_id, options, total, created_at) VALUES (?, ?, ?, ?)",
+                    (job_id, json.dumps(options), len(urls), time.time()),
+                ).rowcount == 1
+                if created:
+                    self._conn.executemany(
+                        "INSERT INTO ingest_items (job_id, position, url, status) VALUES (?, ?, ?, 'pending')",
+                        [(job_id, position, url) for position, url in enumerate(urls)],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return created
+
+    def options(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT options FROM ingest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def claim(self, job_id: str, lease_seconds: float) -> Optional[Tuple[int, str]]:
+        """Atomically take the next pending item, or one whose lease expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("""
+                UPDATE ingest_items SET status = 'running', attempts = attempts + 1, claimed_at = ?
+                WHERE rowid = (
+                    SELECT rowid FROM ingest_items
+                    WHERE job_id = ? AND (status = 'pending' OR (status = 'running' AND claimed_at < ?))
+                    ORDER BY position LIMIT 1
+                )
+                RETURNING position, url
+            """, (now, job_id, now - lease_seconds)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def finish(self, job_id: str, position: int, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingest_items SET status = ?, error = ?, finished_at = ? WHERE job_id = ? AND position = ?",
+                (status, error, time.time(), job_id, position),
+            )
+
+    def release(self, job_id: str, position: int, error: Optional[str] = None, refund_attempt: bool = False):
+        """Put an item back in the queue for another attempt, or without using one up (on shutdown)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingest_items SET status = 'pending', error = ?, claimed_at = NULL, attempts = attempts - ? "
+                "WHERE job_id = ? AND position = ?",
+                (error, int(refund_attempt), job_id, position),
+            )
+
+    def attempts(self, job_id: str, position: int) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM ingest_items WHERE job_id = ? AND position = ?", (job_id, position)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT total, created_at FROM ingest_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM ingest_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            failures = self._conn.execute(
+                "SELECT url, error FROM ingest_items WHERE job_id = ? AND status = 'failed' ORDER BY position", (job_id,)
+            ).fetchall()
+        total = job[0]
+        finished = sum(counts.get(state, 0) for state in FINISHED_STATES)
+        return {
+            "job_id": job_id,
+            "total": total,
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "skipped": counts.get("skipped", 0),
+            "failed": counts.get("failed", 0),
+            "finished": finished == total,
+            "created_at": job[1],
+            "failures": [{"url": url, "error": error} for url, error in failures],
+        }
+
+    def pending_urls(self, job_id: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM ingest_items WHERE job_id = ? AND status = 'pending' ORDER BY position", (job_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def unfinished_jobs(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT DISTINCT job_id FROM ingest_items WHERE status IN ('pending', 'running')
+            """).fetchall()
+        return [row[0] for row in rows]
+
+
+async def run_job(
+    store: IngestStore,
+    job_id: str,
+    process: Callable[[str, Dict], Awaitable[str]],
+    concurrency: int = 4,
+    lease_seconds: float = 600,
+    max_attempts: int = 2,
+    on_progress: Optional[Callable[[str, str, Optional[str]], None]] = None,
+    run_blocking: Callable[..., Awaitable] = asyncio.to_thread,
+) -> Dict:
+    """Work through a job's items with a bounded worker pool.
+
+    `process(url, options)` returns the final state ("done" or "skipped"). An exception puts
+    the item back for another attempt until max_attempts, then marks it failed; exceptions with
+    a 4xx status_code fail the item straight away. Store calls go through `run_blocking(func, *args)`
+    so SQLite never blocks the event loop.
+    """
+    options = await run_blocking(store.options, job_id)
+    if options is None:
+        raise KeyError(job_id)
+
+    async def worker():
+        while True:
+            item = await run_blocking(store.claim, job_id, lease_seconds)
+            if item is None:
+                return
+            position, url = item
+            try:
+                state = await process(url, options)
+                await run_blocking(store.finish, job_id, position, state)
+                error = None
+            except asyncio.CancelledError:
+                # Shutting down: leave the item for whoever resumes the job. Shielded, as this task
+                # is being cancelled; otherwise the item keeps its lease until it expires
+                await asyncio.shield(run_blocking(store.release, job_id, position, refund_attempt=True))
+                raise
+            except Exception as e:
+                error = getattr(e, "detail", None) or str(e)
+                # Client errors such as an invalid URL or a video without captions will not go away on retry
+                permanent = 400 <= (getattr(e, "status_code", None) or 500) < 500
+                if not permanent and await run_blocking(store.attempts, job_id, position) < max_attempts:
+                    await run_blocking(store.release, job_id, position, error)
+                    state = "retry"
+                else:
+                    await run_blocking(store.finish, job_id, position, "failed", error)
+                    state = "failed"
+            if on_progress is not None:
+                on_progress(url, state, error)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return await run_blocking(store.status, job_id)
+
+
+def read_urls(path: str) -> List[str]:
+    """One URL or bare 11-character video id per line; blank lines and # comments are ignored"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch ingest videos into the knowledge graph and summary cache")
+    parser.add_argument("sources", nargs="*", help="video or playlist URLs, or files with one URL per line")
+    parser.add_argument("--job-id", help="name for the job; by default it is derived from the URLs and options")
+    parser.add_argument("--resume", action="store_true", help="resume every unfinished job instead")
+    parser.add_argument("--status", metavar="JOB_ID", help="print the progress of a job and exit")
+    parser.add_argument("--language", default="english")
+    parser.add_argument("--word-count", type=int, default=300)
+    parser.add_argument("--style", default="normal")
+    parser.add_argument("--concurrency", type=int, help="videos processed at once (default: INGEST_CONCURRENCY)")
+    args = parser.parse_args()
+
+    import main
+
+    if args.status:
+        print(json.dumps(main.ingest_store.status(args.status), indent=2))
+        raise SystemExit(0)
+
+    async def run_cli():
+        if args.resume:
+            job_ids = await main.run_blocking(main.ingest_store.unfinished_jobs)
+        else:
+            if not args.sources:
+                parser.error("give URLs or files of URLs, or --resume")
+            urls = []
+            for source in args.sources:
+                urls.extend(read_urls(source) if os.path.isfile(source) else [source])
+            options = {"language": args.language, "word_count": args.word_count, "style": args.style}
+            job_id, _ = await main.create_ingest_job(urls, options, args.job_id)
+            job_ids = [job_id]
+
+        try:
+            await main.run_blocking(main.create_neo4j_driver)
+            await main.ensure_graph_schema()
+            for job_id in job_ids:
+                print(f"Running job {job_id}")
+                status = await main.run_ingest_job(job_id, args.concurrency, on_progress=lambda url, state, error: print(
+                    f"  {state:<8} {url}" + (f" ({error})" if error else "")
+                ))
+                print(json.dumps(status, indent=2))
+        finally:
+            await main.close_clients()
+
+    asyncio.run(run_cli())
@@ -0,0 +1,115 @@
+import json
+import re
+from typing import Iterable, List, Tuple
+
+# A trailing backslash or an unfinished \uXXXX escape that cannot be decoded yet
+_INCOMPLETE_ESCAPE = re.compile(r'(?<!\\)((?:\\\\)*)\\(?:u[0-9a-fA-F]{0,3})?$')
+
+
+class JsonFieldStream:
+    """Incrementally parse the top-level fields of a JSON object as its text streams in.
+
+    feed() returns events as soon as they are known:
+      ("field", key, value)  when a top-level value is complete
+      ("delta", key, text)   for newly decoded text of a top-level string value still streaming,
+                             only for keys listed in `stream_keys`
+    Anything before the opening brace (such as a markdown fence) is ignored.
+    """
+
+    def __init__(self, stream_keys: Iterable[str] = ()):
+        self.stream_keys = set(stream_keys)
+        self.buffer = ""
+        self.fields = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._phase = "start"  # start -> key -> colon -> value -> key ... -> done
+        self._token_start = 0
+        self._key = None
+        self._value_is_string = False
+        self._emitted = 0
+
+    @property
+    def complete(self) -> bool:
+        """True once the closing brace of the top-level object has been seen"""
+        return self._phase == "done"
+
+    def feed(self, text: str) -> List[Tuple]:
+        events = []
+        self.buffer += text
+        while self._pos < len(self.buffer):
+            i = self._pos
+            char = self.buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._phase == "key":
+                        self._key = json.loads(self.buffer[self._token_start:i + 1])
+                        self._phase = "colon"
+                continue
+
+            if self._phase == "start":
+                if char == "{":
+                    self._depth = 1
+                    self._phase = "key"
+                continue
+            if self._phase == "done":
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._phase == "key":
+                    self._token_start = i
+                elif self._depth == 1 and self._phase == "value" and not self.buffer[self._token_start:i].strip():
+                    self._value_is_string = True
+            elif char == ":" and self._depth == 1 and self._phase == "colon":
+                self._phase = "value"
+                self._token_start = i + 1
+                self._value_is_string = False
+                self._emitted = 0
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_value(i, events)
+                    self._phase = "done"
+            elif char == "," and self._depth == 1 and self._phase == "value":
+                self._complete_value(i, events)
+                self._phase = "key"
+
+        if self._in_string and self._value_is_string and self._depth == 1 and self._key in self.stream_keys:
+            self._stream_partial(events)
+        return events
+
+    def _complete_value(self, end: int, events: List[Tuple]):
+        if self._phase != "value" or self._key is None:
+            return
+        raw = self.buffer[self._token_start:end].strip()
+        try:
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            return
+        if self._value_is_string and self._key in self.stream_keys and len(value) > self._emitted:
+            events.append(("delta", self._key, value[self._emitted:]))
+        self.fields[self._key] = value
+        events.append(("field", self._key, value))
+        self._key = None
+
+    def _stream_partial(self, events: List[Tuple]):
+        raw = self.buffer[self._token_start:self._pos].lstrip()[1:]
+        raw = _INCOMPLETE_ESCAPE.sub(lambda m: m.group(1), raw)
+        try:
+            decoded = json.loads(f'"{raw}"', strict=False)
+        except json.JSONDecodeError:
+            return
+        if len(decoded) > self._emitted:
+            events.append(("delta", self._key, decoded[self._emitted:]))
+            self._emitted = len(decoded)
@@ -0,0 +1,286 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from groq import APIConnectionError, APIStatusError, RateLimitError
+
+# Call priorities, lowest value first
+INTERACTIVE = 0  # a user is waiting on this answer (Q&A, speech)
+NORMAL = 1       # summaries and their translations
+BACKGROUND = 2   # knowledge graph extraction
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BACKGROUND: "background"}
+
+
+class _Budget:
+    """Token bucket refilled continuously at `per_minute` units per minute; 0 disables it"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        # A single call larger than the whole budget only waits for a full bucket
+        needed = min(cost, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60 / self.capacity
+
+    def take(self, cost: float):
+        if self.capacity > 0:
+            self.level -= cost
+
+    def refund(self, amount: float):
+        if self.capacity > 0:
+            self.level = min(self.capacity, self.level + amount)
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    """Seconds from the retry-after-ms or Retry-After header of a failed response"""
+    headers = error.response.headers if error.response is not None else {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _ReleasingStream:
+    """Wraps a streamed completion so its scheduler slot is held until the stream is consumed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def _done(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._done()
+
+    def __del__(self):
+        # A stream that is dropped without being iterated still gives its slot back
+        self._done()
+
+
+class LLMScheduler:
+    """Central gate for chat completion calls.
+
+    Calls wait in a priority queue until a concurrency slot and enough of the
+    request and token budgets are free. Rate limits, 5xx responses and connection
+    errors are retried with jittered exponential backoff; a Retry-After from the
+    API pauses every queued call, since the quota is shared.
+
+    `observer(model, seconds, usage, error)` is called after every attempt, for metrics.
+    With `client` None, `client_factory()` supplies it on each call, e.g. a client owned by the app lifespan.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        completion_tokens_estimate: int = 1024,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        observer: Optional[Callable] = None,
+        token_estimator: Optional[Callable[[str], int]] = None,
+        client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.client = client
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.completion_tokens_estimate = completion_tokens_estimate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.observer = observer
+        # Prompt tokens from text; about four characters per token when not given
+        self.token_estimator = token_estimator
+        self._requests = _Budget(requests_per_minute)
+        self._tokens = _Budget(tokens_per_minute)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._stats = {
+            "requests_total": 0,
+            "retries_total": 0,
+            "rate_limited_total": 0,
+            "failures_total": 0,
+            "tokens_total": 0,
+        }
+        self._waits = {name: {"count": 0, "sum": 0.0, "max": 0.0} for name in PRIORITY_NAMES.values()}
+
+    async def create(self, priority: int = NORMAL, **kwargs) -> Any:
+        """Same arguments and result as client.chat.completions.create"""
+        cost = self._estimate_tokens(kwargs)
+        attempt = 0
+        while True:
+            await self._admit(priority, cost)
+            started = time.monotonic()
+            try:
+                client = self.client if self.client is not None else self.client_factory()
+                response = await client.chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                self._release()
+                raise
+            except Exception as e:
+                self._release()
+                self._observe(kwargs, started, None, e)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self._stats["failures_total"] += 1
+                    raise
+                attempt += 1
+                self._stats["retries_total"] += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._stats["requests_total"] += 1
+            usage = getattr(response, "usage", None)
+            self._observe(kwargs, started, usage, None)
+            if kwargs.get("stream"):
+                self._stats["tokens_total"] += cost
+                return _ReleasingStream(response, self._release)
+
+            self._release()
+            used = getattr(usage, "total_tokens", None) or cost
+            # Give back (or charge) the difference between the estimate and the real usage
+            self._tokens.refund(cost - used)
+            self._stats["tokens_total"] += used
+            return response
+
+    def metrics(self) -> Dict:
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _, future, _ in self._queue:
+            if not future.done():
+                queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "queue_depth": sum(queued.values()),
+            "queued": queued,
+            "in_flight": self._in_flight,
+            "paused_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "wait_seconds": {name: dict(stats) for name, stats in self._waits.items()},
+            **self._stats,
+        }
+
+    def _observe(self, kwargs: Dict, started: float, usage, error: Optional[Exception]):
+        if self.observer is None:
+            return
+        try:
+            self.observer(kwargs.get("model"), time.monotonic() - started, usage, error)
+        except Exception as e:
+            print(f"LLM scheduler observer failed: {str(e)}")
+
+    def _estimate_tokens(self, kwargs: Dict) -> int:
+        # Prompt tokens plus the expected completion
+        prompt = "\n".join(str(message.get("content") or "") for message in kwargs.get("messages", []))
+        completion = kwargs.get("max_tokens") or kwargs.get("max_completion_tokens") or self.completion_tokens_estimate
+        if self.token_estimator is not None:
+            return self.token_estimator(prompt) + completion
+        return len(prompt) // 4 + completion
+
+    async def _admit(self, priority: int, cost: int):
+        enqueued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), cost, future, enqueued_at))
+        self._changed.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller went away; hand the slot back
+                self._release()
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        stats = self._waits[PRIORITY_NAMES.get(priority, "normal")]
+        stats["count"] += 1
+        stats["sum"] += waited
+        stats["max"] = max(stats["max"], waited)
+
+    async def _dispatch(self):
+        while self._queue:
+            priority, _, cost, future, _ = self._queue[0]
+            if future.done():
+                # The waiter was cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+
+            self._changed.clear()
+            now = time.monotonic()
+            if self._in_flight >= self.max_concurrency:
+                delay = None
+            else:
+                delay = max(
+                    self._paused_until - now,
+                    self._requests.wait_time(1, now),
+                    self._tokens.wait_time(cost, now),
+                )
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            self._requests.take(1)
+            self._tokens.take(cost)
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._changed.set()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error should be raised"""
+        if attempt >= self.max_retries:
+            return None
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if isinstance(error, RateLimitError):
+            self._stats["rate_limited_total"] += 1
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                # Small jitter so the retried calls do not all land at the same instant
+                return retry_after + random.uniform(0, self.base_delay)
+            return backoff
+        if isinstance(error, APIConnectionError):
+            return backoff
+        if isinstance(error, APIStatusError) and error.status_code >= 500:
+            return backoff
+        return None
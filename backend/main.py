@@ -1,24 +1,71 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from youtube_transcript_api import YouTubeTranscriptApi
 import re
 import os
 import base64
 import tempfile
 import json
+import asyncio
+import copy
+import functools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq
 import httpx
 from typing import Optional, List, Dict
-import ssl
-from neo4j import GraphDatabase
-from urllib3.util import ssl_
-from gtts import gTTS
+import io
+from cache import ResultCache, make_cache_key
+from compaction import COMPACTION_VERSION, compact_transcript, compaction_stats, estimate_tokens
+from entity_index import ENTITY_SCHEMA, EntityIndex, backfill_normalized_names, normalize_entity_name
+from retrieval import TranscriptIndex, rank_triples
+from timestamp_index import TimestampIndex, find_time_references, parse_timestamp
+from transcript_store import TranscriptStore, has_timings, segments_from_text
+from youtube_fetch import FetchPool, http2_available, is_blocked, is_unavailable, pooled_session
+from ingest import IngestStore, run_job
+from singleflight import FileLockBackend, LocalLockBackend, SingleFlight
+from json_stream import JsonFieldStream
+from llm_scheduler import LLMScheduler, INTERACTIVE, NORMAL, BACKGROUND, PRIORITY_NAMES
+from model_router import ModelRouter, parse_routes
+from telemetry import registry, span, traced, timer, record_llm_call, record_route, HTTP_REQUEST_SECONDS, NEO4J_QUERY_SECONDS, TRANSCRIPT_CHARS
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_clients()
+    # Neo4j is connected in the background so the API serves right away;
+    # until it answers, summaries are served without the knowledge graph
+    start_graph_connect()
+    
+    if INGEST_RESUME_ON_STARTUP:
+        for job_id in await run_blocking(ingest_store.unfinished_jobs):
+            print(f"Resuming ingest job {job_id}")
+            start_ingest_job(job_id)
+    
+    yield
+    
+    # Interrupted ingest items go back to pending for the next start
+    for task in list(ingest_tasks.values()):
+        task.cancel()
+    if ingest_tasks:
+        await asyncio.wait(list(ingest_tasks.values()))
+    
+    # Let detached graph builds finish before the clients they use are closed
+    if background_tasks:
+        await asyncio.wait(list(background_tasks), timeout=BACKGROUND_DRAIN_SECONDS)
+    if _graph_connect_task is not None:
+        _graph_connect_task.cancel()
+    await close_clients()
+    close_blocking_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for all origins
 app.add_middleware(
@@ -38,7 +85,180 @@ async def hello():
         "version": "1.0.0"
     }
 
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Created by the lifespan with open_clients() (or on first use outside the app, e.g. the ingest CLI)
+# and closed with it, so a later lifespan in the same process starts with fresh ones
+groq_client: Optional[AsyncGroq] = None
+
+def get_groq_client() -> AsyncGroq:
+    global groq_client
+    if groq_client is None:
+        # GROQ_BASE_URL (read by the client) can point at a local fake server such as benchmarks/fake_groq.py.
+        # Retries are left to the scheduler, which shares Retry-After waits across all queued calls
+        groq_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+    return groq_client
+
+# Every chat completion goes through the scheduler: priority queue, rate budgets and retries.
+# Budgets of 0 are unlimited; set them to the account's Groq limits to avoid 429s in the first place
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+
+llm = LLMScheduler(
+    None,
+    client_factory=get_groq_client,
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+    max_retries=LLM_MAX_RETRIES,
+    observer=record_llm_call,
+    token_estimator=estimate_tokens,
+)
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """Scheduler queue depth, wait times, retries and token usage, and model routing decisions"""
+    return {**llm.metrics(), "routing": router.metrics()}
+
+def _llm_queue_depth():
+    queued = llm.metrics()["queued"]
+    return [({"priority": name}, queued[name]) for name in PRIORITY_NAMES.values()]
+
+registry.collected("vidinsights_llm_queue_depth", "Chat completions waiting in the scheduler", "gauge", _llm_queue_depth)
+registry.collected("vidinsights_llm_in_flight", "Chat completions being served", "gauge", lambda: [({}, llm.metrics()["in_flight"])])
+registry.collected("vidinsights_llm_retries_total", "Chat completion retries", "counter", lambda: [({}, llm.metrics()["retries_total"])])
+registry.collected("vidinsights_llm_rate_limited_total", "Chat completions answered with 429", "counter", lambda: [({}, llm.metrics()["rate_limited_total"])])
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not the raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+# Fetches from YouTube (transcripts and oEmbed titles) share kept-alive connections and one
+# concurrency and pacing budget, so batch jobs run at full speed without tripping its rate limits.
+# Requests per second of 0 is unpaced.
+YOUTUBE_MAX_CONCURRENCY = int(os.getenv("YOUTUBE_MAX_CONCURRENCY", "8"))
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "0"))
+YOUTUBE_BLOCKED_BACKOFF_SECONDS = float(os.getenv("YOUTUBE_BLOCKED_BACKOFF_SECONDS", "60"))
+YOUTUBE_HTTP2 = os.getenv("YOUTUBE_HTTP2", "true").lower() in ("1", "true", "yes")
+# Can point at a local server such as benchmarks/fake_youtube.py
+YOUTUBE_OEMBED_URL = os.getenv("YOUTUBE_OEMBED_URL", "https://www.youtube.com/oembed")
+# How long "no transcript" and "no such video" answers are remembered; captions may be added later
+NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "3600"))
+
+youtube_pool = FetchPool(YOUTUBE_MAX_CONCURRENCY, YOUTUBE_REQUESTS_PER_SECOND)
+
+registry.collected("vidinsights_youtube_fetches_waiting", "YouTube fetches waiting for a slot", "gauge", lambda: [({}, youtube_pool.waiting)])
+registry.collected("vidinsights_youtube_fetches_total", "YouTube fetches started", "counter", lambda: [({}, youtube_pool.requests)])
+registry.collected("vidinsights_youtube_backoffs_total", "Times YouTube throttled us", "counter", lambda: [({}, youtube_pool.backoffs)])
+
+# Shared HTTP client so outgoing requests reuse pooled connections (HTTP/2 when h2 is installed)
+http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=10,
+            http2=YOUTUBE_HTTP2 and http2_available(),
+            limits=httpx.Limits(max_connections=YOUTUBE_MAX_CONCURRENCY * 2, max_keepalive_connections=YOUTUBE_MAX_CONCURRENCY, keepalive_expiry=60),
+        )
+    return http_client
+
+def open_clients():
+    get_groq_client()
+    get_http_client()
+
+async def close_clients():
+    """Close the pooled clients and the Neo4j driver; the next use or lifespan creates new ones"""
+    global groq_client, http_client, neo4j_driver
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+    if groq_client is not None:
+        await groq_client.close()
+        groq_client = None
+    if neo4j_driver is not None:
+        await neo4j_driver.close()
+        neo4j_driver = None
+
+# Bounded thread pool for libraries without an async API (transcript fetch, gTTS, file I/O)
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+blocking_pool: Optional[ThreadPoolExecutor] = None
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the bounded thread pool without stalling the event loop"""
+    global blocking_pool
+    if blocking_pool is None:
+        blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_pool, functools.partial(func, *args, **kwargs))
+
+def close_blocking_pool():
+    global blocking_pool
+    if blocking_pool is not None:
+        blocking_pool.shutdown(wait=False)
+        blocking_pool = None
+
+# Per-stage timeouts for process_video, in seconds
+TITLE_TIMEOUT_SECONDS = float(os.getenv("TITLE_TIMEOUT_SECONDS", "10"))
+GRAPH_TIMEOUT_SECONDS = float(os.getenv("GRAPH_TIMEOUT_SECONDS", "120"))
+SUMMARY_TIMEOUT_SECONDS = float(os.getenv("SUMMARY_TIMEOUT_SECONDS", "180"))
+
+# "inline" waits for the knowledge graph before responding, "background" detaches the build
+GRAPH_BUILD_MODE = os.getenv("GRAPH_BUILD_MODE", "inline").lower()
+BACKGROUND_DRAIN_SECONDS = float(os.getenv("BACKGROUND_DRAIN_SECONDS", "30"))
+
+# Strong references to detached tasks so they are not garbage collected mid-flight
+background_tasks = set()
+
+def _on_background_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background task {task.get_name()} failed: {str(task.exception())}")
+
+def spawn_background(coro, name: str) -> asyncio.Task:
+    """Run a coroutine detached from the current request"""
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+    task.add_done_callback(_on_background_done)
+    return task
+
+async def run_stage(name: str, coro, timeout: float):
+    """Await one pipeline stage, turning a timeout into a 504"""
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"{name} timed out after {timeout:g}s")
+
+async def gather_stages(*coros):
+    """Run stages concurrently; if one fails the others are cancelled and the error re-raised"""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 # Groq model configuration - can be overridden via environment variable
 # NOTE: llama-3.3-70b-specdec was deprecated on March 24, 2025
@@ -47,35 +267,192 @@ groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 # Check https://console.groq.com/docs/models for current available models
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")  # Default to stable versatile model
 
+# Cheaper tasks run on a small, fast model: "task=model[:max_chars],...". Prompts longer than
+# max_chars, tasks not listed and small-model output that fails validation use GROQ_MODEL.
+# Tasks: translation, triples, section_notes, summary, summary_variant, answer, graph_summary
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama-3.1-8b-instant")
+LLM_ROUTES = os.getenv("LLM_ROUTES", f"translation={LLM_SMALL_MODEL}:8000,triples={LLM_SMALL_MODEL}:40000")
+
+router = ModelRouter(llm, GROQ_MODEL, parse_routes(LLM_ROUTES), observer=record_route)
+
 # Neo4j setup (optional)
 neo4j_uri = os.getenv("NEO4J_URI")
 neo4j_user = os.getenv("NEO4J_USERNAME")  
 neo4j_password = os.getenv("NEO4J_PASSWORD")
 
-# Validate Neo4j credentials
-if not all([neo4j_uri, neo4j_user, neo4j_password]):
-    raise ValueError("Missing Neo4j credentials. Please check your .env file.")
+# Managed transactions retry transient errors for up to NEO4J_MAX_RETRY_SECONDS
+NEO4J_MAX_RETRY_SECONDS = float(os.getenv("NEO4J_MAX_RETRY_SECONDS", "15"))
+NEO4J_CONNECT_TIMEOUT_SECONDS = float(os.getenv("NEO4J_CONNECT_TIMEOUT_SECONDS", "5"))
+NEO4J_RECONNECT_SECONDS = float(os.getenv("NEO4J_RECONNECT_SECONDS", "30"))
 
-try:
-    # Initialize Neo4j driver with proper SSL configuration
-    neo4j_driver = GraphDatabase.driver(
-        neo4j_uri,
-        auth=(neo4j_user, neo4j_password)
-    )
-    
-    # Test connection
-    with neo4j_driver.session() as session:
-        result = session.run("RETURN 1")
-        result.single()  # Verify we can actually execute a query
-    print("Successfully connected to Neo4j database")
-    
-except Exception as e:
-    print(f"Failed to connect to Neo4j: {str(e)}")
-    raise ValueError(f"Neo4j connection failed: {str(e)}")
+# The driver (and the neo4j package) is loaded by the connection task, off the event loop
+neo4j_driver = None
+_neo4j_driver_lock = threading.Lock()
+
+# available is None until the first probe finishes, False while Neo4j is unreachable (degraded mode)
+graph_status = {"available": None, "error": None}
+_graph_connect_task: Optional[asyncio.Task] = None
+# Videos summarized while Neo4j was down; their graphs are built once it is back
+pending_graph_builds = set()
+
+class GraphUnavailable(HTTPException):
+    def __init__(self, detail: str = "Knowledge graph database is unavailable"):
+        super().__init__(status_code=503, detail=detail)
+
+def create_neo4j_driver():
+    """Build the driver once and publish it (blocking, run it through run_blocking)"""
+    global neo4j_driver
+    with _neo4j_driver_lock:
+        if neo4j_driver is None:
+            if not all([neo4j_uri, neo4j_user, neo4j_password]):
+                raise GraphUnavailable("Missing Neo4j credentials. Please check your .env file.")
+            from neo4j import AsyncGraphDatabase
+            neo4j_driver = AsyncGraphDatabase.driver(
+                neo4j_uri,
+                auth=(neo4j_user, neo4j_password),
+                max_transaction_retry_time=NEO4J_MAX_RETRY_SECONDS,
+                connection_timeout=NEO4J_CONNECT_TIMEOUT_SECONDS,
+            )
+        return neo4j_driver
 
 def get_neo4j_driver():
+    """The driver published by the connection task; 503 until it has built one"""
+    if neo4j_driver is None:
+        raise GraphUnavailable(graph_status["error"] or "Knowledge graph database is still connecting")
     return neo4j_driver
 
+def graph_available() -> bool:
+    return graph_status["available"] is not False
+
+def is_graph_outage(e: Exception) -> bool:
+    """True for errors meaning Neo4j cannot be reached, as opposed to a failed query"""
+    if isinstance(e, GraphUnavailable):
+        return True
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired
+    return isinstance(e, (ServiceUnavailable, SessionExpired))
+
+def mark_graph_down(e: Exception):
+    if graph_status["available"] is not False:
+        print(f"Neo4j is unavailable, serving without the knowledge graph: {str(e)}")
+    graph_status.update(available=False, error=str(e))
+    start_graph_connect()
+
+async def _connect_graph():
+    """Probe Neo4j until it answers, then ensure the schema and build graphs deferred while it was down"""
+    while True:
+        try:
+            # Importing neo4j and building the driver takes a while; keep it off the event loop
+            driver = await run_blocking(create_neo4j_driver)
+            async with driver.session() as session:
+                result = await asyncio.wait_for(session.run("RETURN 1"), NEO4J_CONNECT_TIMEOUT_SECONDS)
+                await result.single()  # Verify we can actually execute a query
+            await ensure_graph_schema()
+        except GraphUnavailable as e:
+            # Missing configuration will not fix itself; stay degraded
+            graph_status.update(available=False, error=e.detail)
+            print(f"Knowledge graph disabled: {e.detail}")
+            return
+        except Exception as e:
+            graph_status.update(available=False, error=str(e))
+            print(f"Failed to connect to Neo4j, retrying in {NEO4J_RECONNECT_SECONDS:g}s: {str(e)}")
+            await asyncio.sleep(NEO4J_RECONNECT_SECONDS)
+            continue
+        
+        graph_status.update(available=True, error=None)
+        print("Successfully connected to Neo4j database")
+        spawn_background(backfill_normalized_names(driver), name="entity-backfill")
+        for video_id in list(pending_graph_builds):
+            pending_graph_builds.discard(video_id)
+            spawn_background(build_deferred_graph(video_id), name=f"knowledge-graph-{video_id}")
+        return
+
+def start_graph_connect():
+    global _graph_connect_task
+    if _graph_connect_task is None or _graph_connect_task.done():
+        _graph_connect_task = asyncio.create_task(_connect_graph(), name="neo4j-connect")
+
+registry.collected(
+    "vidinsights_graph_available", "1 while Neo4j is reachable, 0 in degraded mode", "gauge",
+    lambda: [({}, int(graph_status["available"] is True))],
+)
+
+@app.get("/health")
+async def health():
+    """ok with the knowledge graph, degraded while Neo4j is unreachable, starting until the first probe"""
+    available = graph_status["available"]
+    return {
+        "status": "starting" if available is None else "ok" if available else "degraded",
+        "graph": {
+            "available": available,
+            "error": graph_status["error"],
+            "pending_builds": len(pending_graph_builds),
+        },
+    }
+
+# Result cache for transcripts, titles and structured summaries
+# SQLite file on local disk with an in-process LRU in front of it
+CACHE_PATH = os.getenv("CACHE_PATH", "cache.db")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_MEMORY_ENTRIES = int(os.getenv("CACHE_MEMORY_ENTRIES", "512"))
+
+result_cache = ResultCache(
+    CACHE_PATH,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    memory_entries=CACHE_MEMORY_ENTRIES,
+)
+
+async def cache_get(key: str, cache: Optional[ResultCache] = None):
+    """Cache read for async code: the in-process tier inline, the SQLite tier on the blocking pool"""
+    cache = cache or result_cache
+    value = cache.peek(key)
+    if value is None:
+        value = await run_blocking(cache.get, key)
+    return value
+
+async def cache_set(key: str, value, ttl_seconds: Optional[int] = None, cache: Optional[ResultCache] = None):
+    await run_blocking((cache or result_cache).set, key, value, ttl_seconds)
+
+# Durable compressed store for raw transcript segments; Video nodes only keep a reference
+TRANSCRIPT_STORE_PATH = os.getenv("TRANSCRIPT_STORE_PATH", "transcripts.db")
+transcript_store = TranscriptStore(TRANSCRIPT_STORE_PATH)
+
+async def load_stored_transcript(video_id: str) -> Optional[List[Dict]]:
+    """Transcript segments from the result cache or the transcript store, without fetching from YouTube"""
+    transcript_key = make_cache_key("transcript", video_id)
+    transcript_data = await cache_get(transcript_key)
+    if transcript_data is None:
+        transcript_data = await run_blocking(transcript_store.get, video_id)
+        if transcript_data is not None:
+            await cache_set(transcript_key, transcript_data)
+    return transcript_data
+
+async def load_timed_transcript(video_id: str) -> Optional[List[Dict]]:
+    """load_stored_transcript, skipping untimed segments such as transcripts migrated off Neo4j nodes"""
+    transcript_data = await load_stored_transcript(video_id)
+    if transcript_data is None or not has_timings(transcript_data):
+        return None
+    return transcript_data
+
+# Request coalescing: concurrent identical requests share one in-flight computation
+# "file" also coalesces across uvicorn workers on the same host, "local" only within one worker
+SINGLEFLIGHT_BACKEND = os.getenv("SINGLEFLIGHT_BACKEND", "file").lower()
+SINGLEFLIGHT_LOCK_DIR = os.getenv("SINGLEFLIGHT_LOCK_DIR", "locks")
+SINGLEFLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLEFLIGHT_LOCK_TIMEOUT", "300"))
+
+def _make_lock_backend():
+    if SINGLEFLIGHT_BACKEND == "file":
+        try:
+            return FileLockBackend(SINGLEFLIGHT_LOCK_DIR)
+        except RuntimeError as e:
+            print(f"Falling back to in-process request coalescing: {str(e)}")
+    return LocalLockBackend()
+
+request_flight = SingleFlight(_make_lock_backend(), lock_timeout=SINGLEFLIGHT_LOCK_TIMEOUT)
+
 class VideoRequest(BaseModel):
     video_url: str
     language: str
@@ -114,98 +491,208 @@ class TextFormatter:
     def format_transcript(self, transcript):
         return " ".join([entry["text"] for entry in transcript])
 
+VIDEO_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
 def extract_video_id(url: str) -> str:
+    """Video id from a YouTube URL, or the id itself when given a bare one"""
+    url = url.strip()
+    if VIDEO_ID_PATTERN.match(url):
+        return url
     video_id_match = re.search(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', url)
     if not video_id_match:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
     return video_id_match.group(1)
 
-def create_knowledge_graph(video_id: str, transcript_text: str):
+# Uniqueness constraints the graph writer relies on for MERGE lookups
+GRAPH_SCHEMA = [
+    "CREATE CONSTRAINT video_id_unique IF NOT EXISTS FOR (v:Video) REQUIRE v.video_id IS UNIQUE",
+    "CREATE CONSTRAINT entity_name_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+]
+
+# Plain indexes used instead when existing duplicate nodes prevent a constraint
+GRAPH_SCHEMA_FALLBACK = [
+    "CREATE INDEX video_id_index IF NOT EXISTS FOR (v:Video) ON (v.video_id)",
+    "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:Entity) ON (e.name)",
+]
+
+async def ensure_graph_schema():
+    """Create the constraints and indexes on Video.video_id and Entity.name (run at startup)"""
+    async with get_neo4j_driver().session() as session:
+        for statement, fallback in zip(GRAPH_SCHEMA, GRAPH_SCHEMA_FALLBACK):
+            try:
+                with timer(NEO4J_QUERY_SECONDS, query="schema"):
+                    await session.run(statement)
+            except Exception as e:
+                print(f"Could not create constraint, falling back to an index: {str(e)}")
+                with timer(NEO4J_QUERY_SECONDS, query="schema"):
+                    await session.run(fallback)
+        # The entity index works without these, only slower
+        for statement in ENTITY_SCHEMA:
+            try:
+                with timer(NEO4J_QUERY_SECONDS, query="schema"):
+                    await session.run(statement)
+            except Exception as e:
+                print(f"Could not create entity index: {str(e)}")
+
+def parse_triples(content: str) -> List[Dict[str, str]]:
+    """Parse entity1|relationship|entity2 lines from the LLM output, skipping malformed and duplicate ones"""
+    triples = []
+    seen = set()
+    for line in content.strip().split('\n'):
+        # Drop list markers such as "1." or "-" that models sometimes prepend
+        line = re.sub(r'^\s*(?:[-*•]|\d+[.)])\s+', '', line)
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) != 3 or not all(parts):
+            continue
+        if tuple(parts) in seen:
+            continue
+        seen.add(tuple(parts))
+        triples.append({"entity1": parts[0], "relationship": parts[1], "entity2": parts[2]})
+    return triples
+
+async def _write_graph(tx, video_id: str, triples: List[Dict[str, str]]):
+    # One round trip: the video node, every entity and every relationship.
+    # The transcript itself lives in the transcript store; the node only references it.
+    # normalized_name lets the entity index match spellings of an entity across videos.
+    triples = [
+        {**triple, "normalized1": normalize_entity_name(triple["entity1"]), "normalized2": normalize_entity_name(triple["entity2"])}
+        for triple in triples
+    ]
+    await tx.run("""
+        MERGE (v:Video {video_id: $video_id})
+        ON CREATE SET v.transcript_ref = $video_id
+        WITH v
+        UNWIND $triples AS triple
+        MERGE (e1:Entity {name: triple.entity1})
+        SET e1.normalized_name = triple.normalized1
+        MERGE (e2:Entity {name: triple.entity2})
+        SET e2.normalized_name = triple.normalized2
+        MERGE (e1)-[:RELATES_TO {type: triple.relationship}]->(e2)
+        MERGE (v)-[:HAS_ENTITY]->(e1)
+        MERGE (v)-[:HAS_ENTITY]->(e2)
+    """, video_id=video_id, triples=triples)
+
+@traced("knowledge_graph")
+async def create_knowledge_graph(video_id: str, transcript_text: str, transcript_data: Optional[List[Dict]] = None):
     try:
-        with neo4j_driver.session() as session:
-            # First, test the connection
-            session.run("RETURN 1")
-            
-            # check video already exists in knowledge graph
-            result = session.run("""
-                MATCH (v:Video {video_id: $video_id}) 
-                RETURN v LIMIT 1
-            """, video_id=video_id)
+        # check video already exists in knowledge graph
+        async with get_neo4j_driver().session() as session:
+            with timer(NEO4J_QUERY_SECONDS, query="video_exists"):
+                result = await session.run("""
+                    MATCH (v:Video {video_id: $video_id}) 
+                    RETURN v.video_id LIMIT 1
+                """, video_id=video_id)
+                record = await result.single()
             
-            if result.single():
+            if record:
                 print(f"Video with ID '{video_id}' already exists. Aborting operation.")
                 return  # Stop function if video already exists
-
-            
-            # Create video node
-            session.run("""
-                CREATE (v:Video {video_id: $video_id, transcript: $transcript})
-            """, video_id=video_id, transcript=transcript_text)
-            
-            # Generate entities and relationships using Groq
-            prompt = f"""
-            Analyze this video transcript and identify key entities (people, places, concepts, events) and their relationships.
-            Format the output as a list of triples (entity1, relationship, entity2).
-            Keep it focused on the most important relationships.
-            
-            Transcript:
-            {transcript_text}
-            
-            Output only the triples in this format (maximum 10 relationships):
-            entity1|relationship|entity2
-            """
-            
-            response = groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=GROQ_MODEL,
-                temperature=0.3,
-            )
-            
-            triples = response.choices[0].message.content.strip().split('\n')
-            
-            # Create nodes and relationships in Neo4j
-            for triple in triples:
-                if '|' not in triple:
-                    continue
-                try:
-                    entity1, relationship, entity2 = triple.split('|')
-                    session.run("""
-                        MATCH (v:Video {video_id: $video_id})
-                        MERGE (e1:Entity {name: $entity1})
-                        MERGE (e2:Entity {name: $entity2})
-                        MERGE (e1)-[r:RELATES_TO {type: $relationship}]->(e2)
-                        MERGE (v)-[:HAS_ENTITY]->(e1)
-                        MERGE (v)-[:HAS_ENTITY]->(e2)
-                    """, 
-                    video_id=video_id,
-                    entity1=entity1.strip(),
-                    entity2=entity2.strip(),
-                    relationship=relationship.strip()
-                    )
-                except Exception as e:
-                    print(f"Error creating relationship: {str(e)}")
-                    continue
+        
+        # Generate entities and relationships using Groq
+        prompt_transcript = await condense_transcript(video_id, transcript_text, transcript_data)
+        prompt = f"""
+        Analyze this video transcript and identify key entities (people, places, concepts, events) and their relationships.
+        Format the output as a list of triples (entity1, relationship, entity2).
+        Keep it focused on the most important relationships.
+        
+        Transcript:
+        {prompt_transcript}
+        
+        Output only the triples in this format (maximum 10 relationships):
+        entity1|relationship|entity2
+        """
+        
+        response = await router.create(
+            "triples",
+            # A small model that returns no parsable triples is retried on GROQ_MODEL
+            validate=lambda response: parse_triples(response.choices[0].message.content),
+            priority=BACKGROUND,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+        )
+        
+        triples = parse_triples(response.choices[0].message.content)
+        
+        await keep_raw_transcript(video_id)
+        
+        # Create the video, entities and relationships in a single managed write transaction,
+        # which the driver retries on transient errors
+        async with get_neo4j_driver().session() as session:
+            with timer(NEO4J_QUERY_SECONDS, query="write_graph"):
+                await session.execute_write(_write_graph, video_id, triples)
+        entity_index.invalidate([triple[key] for triple in triples for key in ("entity1", "entity2")])
                     
     except Exception as e:
         print(f"Error in create_knowledge_graph: {str(e)}")
+        if is_graph_outage(e):
+            raise GraphUnavailable(f"Failed to create knowledge graph: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to create knowledge graph: {str(e)}"
         )
 
-def enforce_language(text: str, target_language: str) -> str:
+async def build_knowledge_graph(video_id: str, transcript_text: str, transcript_data: Optional[List[Dict]] = None):
+    """create_knowledge_graph for request paths: while Neo4j is down the build is deferred, not failed"""
+    if graph_available():
+        try:
+            await create_knowledge_graph(video_id, transcript_text, transcript_data)
+            return
+        except GraphUnavailable as e:
+            mark_graph_down(e)
+    # Keep the transcript so Q&A works meanwhile and the graph can be built later
+    await keep_raw_transcript(video_id)
+    pending_graph_builds.add(video_id)
+
+async def build_deferred_graph(video_id: str):
+    """Build the graph of a video summarized while Neo4j was down, from the stored transcript"""
+    transcript_data = await load_compacted_transcript(video_id)
+    if not transcript_data:
+        return
+    transcript_text = " ".join(segment["text"] for segment in transcript_data)
+    try:
+        await request_flight.do(
+            f"graph:{video_id}",
+            lambda: build_knowledge_graph(video_id, transcript_text, transcript_data),
+        )
+    except Exception as e:
+        print(f"Deferred knowledge graph for {video_id} failed: {str(e)}")
+
+# Translation instructions per supported output language
+LANGUAGE_PROMPTS = {
+    "english": "Translate this to English if it's not already in English: ",
+    "hindi": "Translate this to Hindi (हिंदी) using Devanagari script: ",
+    "marathi": "Translate this to Marathi (मराठी) using Marathi script. Ensure it's proper Marathi, not Hindi: ",
+    "gujarati": "Translate this to Gujarati (ગુજરાતી) using Gujarati script: ",
+    "bengali": "Translate this to Bengali (বাংলা) using Bengali script: ",
+    "kannada": "Translate this to Kannada (ಕನ್ನಡ) using Kannada script: "
+}
+
+# Unicode blocks of the scripts the non-English output languages are written in
+LANGUAGE_SCRIPTS = {
+    "hindi": ("\u0900", "\u097f"),
+    "marathi": ("\u0900", "\u097f"),
+    "gujarati": ("\u0a80", "\u0aff"),
+    "bengali": ("\u0980", "\u09ff"),
+    "kannada": ("\u0c80", "\u0cff"),
+}
+
+def in_target_script(text: str, target_language: str) -> bool:
+    """True when most letters of the text are in the target language's script (any text for English)"""
+    script = LANGUAGE_SCRIPTS.get(target_language.lower())
+    if script is None:
+        return bool(text.strip())
+    letters = [char for char in text if char.isalpha()]
+    if not letters:
+        return False
+    return sum(1 for char in letters if script[0] <= char <= script[1]) * 2 >= len(letters)
+
+# Upper bound on source characters sent in one batched translation request
+TRANSLATION_BATCH_CHARS = int(os.getenv("TRANSLATION_BATCH_CHARS", "6000"))
+
+async def enforce_language(text: str, target_language: str, priority: int = NORMAL) -> str:
     """Ensure the text is in the specified language using appropriate grammar and script"""
-    language_prompts = {
-        "english": "Translate this to English if it's not already in English: ",
-        "hindi": "Translate this to Hindi (हिंदी) using Devanagari script: ",
-        "marathi": "Translate this to Marathi (मराठी) using Marathi script. Ensure it's proper Marathi, not Hindi: ",
-        "gujarati": "Translate this to Gujarati (ગુજરાતી) using Gujarati script: ",
-        "bengali": "Translate this to Bengali (বাংলা) using Bengali script: ",
-        "kannada": "Translate this to Kannada (ಕನ್ನಡ) using Kannada script: "
-    }
-    
     prompt = f"""
-    {language_prompts.get(target_language.lower(), "Translate to English: ")}
+    {LANGUAGE_PROMPTS.get(target_language.lower(), "Translate to English: ")}
     
     Text: {text}
     
@@ -214,32 +701,334 @@ def enforce_language(text: str, target_language: str) -> str:
     Do not add any disclaimer or translation notes, Also, Dont mention anything about nodes.
     """
     
-    response = groq_client.chat.completions.create(
+    response = await router.create(
+        "translation",
+        validate=lambda response: in_target_script(response.choices[0].message.content, target_language),
+        priority=priority,
         messages=[{"role": "user", "content": prompt}],
-        model=GROQ_MODEL,
         temperature=0.3,
     )
     
     return response.choices[0].message.content.strip()
 
-def generate_structured_summary(video_id: str, transcript_text: str, transcript_data: List[Dict], style: str, word_count: int, language: str = "english") -> Dict:
-    """Generate a comprehensive structured summary with all required fields"""
+async def _translate_batch(batch: Dict[str, str], target_language: str, priority: int = NORMAL) -> Dict[str, str]:
+    """Translate one JSON object of fields in a single request, returning only the fields that validated"""
+    prompt = f"""
+    {LANGUAGE_PROMPTS.get(target_language.lower(), "Translate to English: ")}
+    
+    The text is given as a JSON object. Translate every value and keep every key exactly as it is.
+    Return ONLY a JSON object with the same keys, no markdown formatting or extra text.
+    
+    Important: If the target language is Marathi, ensure it's proper Marathi language and not Hindi.
+    Use appropriate grammar, vocabulary, and expressions specific to the target language.
+    Do not add any disclaimer or translation notes, Also, Dont mention anything about nodes.
+    
+    JSON:
+    {json.dumps(batch, ensure_ascii=False)}
+    """
+    
+    def complete(response) -> bool:
+        # Every key translated into the target script, or the batch is retried on GROQ_MODEL
+        translated = json.loads(response.choices[0].message.content)
+        values = [translated.get(key) for key in batch]
+        if not all(isinstance(value, str) and value.strip() for value in values):
+            return False
+        return in_target_script(" ".join(values), target_language)
+    
+    try:
+        response = await router.create(
+            "translation",
+            validate=complete,
+            priority=priority,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        translated = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        print(f"Batched translation failed: {str(e)}")
+        return {}
+    
+    if not isinstance(translated, dict):
+        return {}
+    return {
+        key: value.strip()
+        for key, value in translated.items()
+        if key in batch and isinstance(value, str) and value.strip()
+    }
+
+@traced("translation")
+async def translate_fields(fields: Dict[str, str], target_language: str, priority: int = NORMAL) -> Dict[str, str]:
+    """Translate many named text fields with as few LLM requests as possible.
+    
+    Fields are packed into JSON batches of up to TRANSLATION_BATCH_CHARS characters.
+    Any field missing or empty in the batched output is translated on its own with enforce_language.
+    """
+    fields = {key: text for key, text in fields.items() if text}
+    if not fields or target_language.lower() == "english":
+        return dict(fields)
+    
+    batches = []
+    current, current_size = {}, 0
+    for key, text in fields.items():
+        if current and current_size + len(text) > TRANSLATION_BATCH_CHARS:
+            batches.append(current)
+            current, current_size = {}, 0
+        current[key] = text
+        current_size += len(text)
+    if current:
+        batches.append(current)
+    
+    translated = {}
+    for batch_result in await asyncio.gather(*[_translate_batch(batch, target_language, priority) for batch in batches]):
+        translated.update(batch_result)
+    
+    # Per-field fallback for anything the batched output dropped or mangled
+    missing = [key for key in fields if key not in translated]
+    fallbacks = await asyncio.gather(*[enforce_language(fields[key], target_language, priority) for key in missing])
+    translated.update(zip(missing, fallbacks))
     
-    # Create timestamp map for transcript
-    timestamp_map = {}
+    return translated
+
+async def translate_structured_summary(structured_data: Dict, target_language: str) -> Dict:
+    """Translate all text fields of a structured summary in batched requests"""
+    fields = {}
+    for name in ("key_takeaway", "how_it_started", "summary"):
+        if structured_data.get(name):
+            fields[name] = structured_data[name]
+    for name in ("key_points", "new_things"):
+        for i, item in enumerate(structured_data.get(name) or []):
+            fields[f"{name}.{i}"] = item
+    for i, topic in enumerate(structured_data.get("top_topics") or []):
+        fields[f"top_topics.{i}.topic"] = topic.get("topic", "")
+        fields[f"top_topics.{i}.description"] = topic.get("description", "")
+    
+    translated = await translate_fields(fields, target_language)
+    
+    for name in ("key_takeaway", "how_it_started", "summary"):
+        if name in translated:
+            structured_data[name] = translated[name]
+    for name in ("key_points", "new_things"):
+        if structured_data.get(name):
+            structured_data[name] = [
+                translated.get(f"{name}.{i}", item) for i, item in enumerate(structured_data[name])
+            ]
+    for i, topic in enumerate(structured_data.get("top_topics") or []):
+        topic["topic"] = translated.get(f"top_topics.{i}.topic", topic.get("topic", ""))
+        topic["description"] = translated.get(f"top_topics.{i}.description", topic.get("description", ""))
+    
+    return structured_data
+
+# Map-reduce settings for transcripts too long to send in a single prompt
+MAP_REDUCE_THRESHOLD_CHARS = int(os.getenv("MAP_REDUCE_THRESHOLD_CHARS", "24000"))
+CHUNK_CHARS = int(os.getenv("CHUNK_CHARS", "12000"))
+MAP_CONCURRENCY = int(os.getenv("MAP_CONCURRENCY", "4"))
+
+# Caps concurrent map-stage LLM calls across all requests
+_map_semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+
+# Interval between [MM:SS] markers inside a chunk, so the map stage can cite real times
+TIMESTAMP_MARKER_SECONDS = 30
+
+# In-flight section-note builds, so concurrent stages for one video share a single map pass
+_condense_inflight: Dict[str, asyncio.Task] = {}
+
+def format_timestamp(seconds: float) -> str:
+    total = int(seconds)
+    hours, remainder = divmod(total, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+def _make_chunk(entries: List[Dict]) -> Dict:
+    parts = []
+    next_marker = None
+    for entry in entries:
+        start = entry.get("start")
+        if start is not None and (next_marker is None or start >= next_marker):
+            parts.append(f"[{format_timestamp(start)}]")
+            next_marker = start + TIMESTAMP_MARKER_SECONDS
+        parts.append(entry["text"])
+    
+    first, last = entries[0], entries[-1]
+    return {
+        "start": first.get("start"),
+        "end": last["start"] + last.get("duration", 0) if last.get("start") is not None else None,
+        "text": " ".join(parts),
+    }
+
+def chunk_transcript(transcript_data: List[Dict], chunk_chars: int = CHUNK_CHARS) -> List[Dict]:
+    """Split transcript segments into chunks of about chunk_chars characters, only breaking between segments"""
+    chunks = []
+    current, current_size = [], 0
     for entry in transcript_data:
-        start_time = int(entry.get("start", 0))
-        minutes = start_time // 60
-        seconds = start_time % 60
-        timestamp_str = f"{minutes:02d}:{seconds:02d}"
-        if timestamp_str not in timestamp_map:
-            timestamp_map[timestamp_str] = entry["text"]
+        if current and current_size + len(entry["text"]) > chunk_chars:
+            chunks.append(_make_chunk(current))
+            current, current_size = [], 0
+        current.append(entry)
+        current_size += len(entry["text"]) + 1
+    if current:
+        chunks.append(_make_chunk(current))
+    return chunks
+
+async def summarize_chunk(chunk: Dict) -> Dict:
+    """Map stage: condense one transcript chunk into notes, key points and timestamped topics"""
+    if chunk["start"] is not None:
+        section = f"{format_timestamp(chunk['start'])} - {format_timestamp(chunk['end'])}"
+    else:
+        section = "untimed"
+    
+    prompt = f"""Summarize this section ({section}) of a longer video transcript in JSON format.
+[MM:SS] markers in the text show when the speech occurs.
+
+Transcript section:
+{chunk["text"]}
+
+Return ONLY valid JSON, no markdown formatting or extra text:
+{{
+  "notes": "A dense summary of this section in 150-250 words",
+  "key_points": ["3-5 key points from this section"],
+  "topics": [
+    {{"topic": "...", "timestamp": "MM:SS taken from the nearest marker", "description": "..."}}
+  ]
+}}
+"""
+    
+    async with _map_semaphore:
+        response = await router.create(
+            "section_notes",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+    
+    content = response.choices[0].message.content
+    try:
+        partial = json.loads(content)
+    except json.JSONDecodeError:
+        partial = {"notes": content}
+    if not isinstance(partial, dict):
+        partial = {"notes": content}
+    partial["section"] = section
+    return partial
+
+def _render_section_notes(partials: List[Dict]) -> str:
+    lines = ["Section notes (the transcript was condensed section by section, in order):"]
+    for partial in partials:
+        lines.append(f"\n[{partial['section']}]")
+        lines.append(str(partial.get("notes", "")).strip())
+        if partial.get("key_points"):
+            lines.append("Key points:")
+            lines.extend(f"- {point}" for point in partial["key_points"])
+        if partial.get("topics"):
+            lines.append("Topics:")
+            for topic in partial["topics"]:
+                if isinstance(topic, dict):
+                    lines.append(f"- {topic.get('timestamp', '')} {topic.get('topic', '')}: {topic.get('description', '')}")
+    return "\n".join(lines)
+
+async def _build_section_notes(transcript_data: List[Dict]) -> str:
+    chunks = chunk_transcript(transcript_data)
+    partials = await asyncio.gather(*[summarize_chunk(chunk) for chunk in chunks])
+    return _render_section_notes(partials)
+
+@traced("condense_transcript")
+async def condense_transcript(video_id: str, transcript_text: str, transcript_data: Optional[List[Dict]] = None) -> str:
+    """Text to put in a prompt in place of the transcript.
+    
+    Short transcripts are returned unchanged. Longer ones are split into timestamp-aware chunks,
+    summarized in parallel (map) and joined as section notes for the final prompt (reduce).
+    """
+    if len(transcript_text) <= MAP_REDUCE_THRESHOLD_CHARS:
+        return transcript_text
+    
+    notes_key = make_cache_key("section_notes", video_id, GROQ_MODEL, CHUNK_CHARS)
+    notes = await cache_get(notes_key)
+    if notes is not None:
+        return notes
+    
+    task = _condense_inflight.get(notes_key)
+    if task is None:
+        if transcript_data is None:
+            transcript_data = await load_compacted_transcript(video_id) or segments_from_text(transcript_text)
+        task = asyncio.ensure_future(_build_section_notes(transcript_data))
+        _condense_inflight[notes_key] = task
+        task.add_done_callback(lambda _: _condense_inflight.pop(notes_key, None))
+    
+    # Shielded so one cancelled caller does not abort the shared map pass
+    notes = await asyncio.shield(task)
+    await cache_set(notes_key, notes)
+    return notes
+
+# Width of the transcript window a topic's words must fall in to count as one mention
+TOPIC_MATCH_WINDOW_SECONDS = float(os.getenv("TOPIC_MATCH_WINDOW_SECONDS", "60"))
+
+def resolve_topic_timestamps(top_topics, transcript_data: List[Dict]):
+    """Replace the model's timestamp guesses with the time each topic is actually discussed.
+    
+    Topics that cannot be matched against the transcript keep the model's timestamp.
+    """
+    if not isinstance(top_topics, list) or not transcript_data:
+        return top_topics
+    index = TimestampIndex(transcript_data)
+    if not index.timed:
+        return top_topics
+    for topic in top_topics:
+        if not isinstance(topic, dict):
+            continue
+        query = f"{topic.get('topic', '')} {topic.get('description', '')}"
+        match = index.locate(query, parse_timestamp(topic.get("timestamp")), TOPIC_MATCH_WINDOW_SECONDS)
+        if match is not None:
+            topic["timestamp"] = format_timestamp(match[0])
+    return top_topics
+
+@traced("summary")
+async def generate_structured_summary(video_id: str, transcript_text: str, transcript_data: List[Dict], style: str, word_count: int, language: str = "english") -> Dict:
+    """Generate a comprehensive structured summary with all required fields"""
+    structured_prompt = await build_structured_prompt(video_id, transcript_text, transcript_data, style, word_count)
+    
+    try:
+        # Try with JSON response format first
+        summary_response = await router.create(
+            "summary",
+            messages=[{"role": "user", "content": structured_prompt}],
+            temperature=0.7,
+            response_format={"type": "json_object"}
+        )
+    except Exception as e:
+        # Fallback if JSON format is not supported
+        print(f"JSON format not supported, trying without: {str(e)}")
+        summary_response = await router.create(
+            "summary",
+            messages=[{"role": "user", "content": structured_prompt}],
+            temperature=0.7
+        )
+    
+    structured_data = parse_structured_summary(summary_response.choices[0].message.content)
+    # Matched against the transcript before translation, while the topics use its words
+    await run_blocking(resolve_topic_timestamps, structured_data.get("top_topics"), transcript_data)
+    await remember_english_summary(video_id, style, word_count, structured_data)
+    
+    # Enforce language for all text fields
+    if language.lower() != "english":
+        structured_data = await translate_structured_summary(structured_data, language)
+    
+    return structured_data
+
+async def build_structured_prompt(video_id: str, transcript_text: str, transcript_data: List[Dict], style: str, word_count: int) -> str:
+    # Long transcripts are condensed into timestamped section notes first
+    prompt_transcript = await condense_transcript(video_id, transcript_text, transcript_data)
+    if prompt_transcript is transcript_text:
+        timestamp_instruction = "For timestamps, estimate based on the content flow, and name and describe each topic in the speaker's own words"
+    else:
+        timestamp_instruction = "For timestamps, use the timestamps given in the section notes"
     
     # Generate comprehensive structured summary
     structured_prompt = f"""Analyze this video transcript and provide a comprehensive structured summary in JSON format.
 
 Video Transcript:
-{transcript_text}
+{prompt_transcript}
 
 Please provide the following information in JSON format:
 1. **key_takeaway**: A one-sentence key takeaway from the video (max 200 words)
@@ -254,7 +1043,7 @@ Please provide the following information in JSON format:
 7. **summary**: A comprehensive {style} summary of approximately {word_count} words covering the entire video
 
 Important:
-- For timestamps, estimate based on the content flow (divide transcript length proportionally)
+- {timestamp_instruction}
 - Make the summary {style} in nature
 - Ensure all fields are filled
 - Return ONLY valid JSON, no markdown formatting or extra text
@@ -273,32 +1062,16 @@ JSON Format:
   "summary": "..."
 }}
 """
-    
-    try:
-        # Try with JSON response format first
-        summary_response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": structured_prompt}],
-            model=GROQ_MODEL,
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-    except Exception as e:
-        # Fallback if JSON format is not supported
-        print(f"JSON format not supported, trying without: {str(e)}")
-        summary_response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": structured_prompt}],
-            model=GROQ_MODEL,
-            temperature=0.7
-        )
-    
+    return structured_prompt
+
+def parse_structured_summary(content: str) -> Dict:
+    """Parse the structured summary JSON, tolerating markdown fences and surrounding text"""
     try:
-        content = summary_response.choices[0].message.content
         structured_data = json.loads(content)
     except json.JSONDecodeError:
         # Fallback if JSON parsing fails
-        content = summary_response.choices[0].message.content
+        structured_data = None
         # Try to extract JSON from markdown code blocks
-        import re
         json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
         if json_match:
             try:
@@ -326,52 +1099,97 @@ JSON Format:
                 "summary": content
             }
     
-    # Enforce language for all text fields
-    if language.lower() != "english":
-        if structured_data.get("key_takeaway"):
-            structured_data["key_takeaway"] = enforce_language(structured_data["key_takeaway"], language)
-        if structured_data.get("key_points"):
-            structured_data["key_points"] = [enforce_language(point, language) for point in structured_data["key_points"]]
-        if structured_data.get("how_it_started"):
-            structured_data["how_it_started"] = enforce_language(structured_data["how_it_started"], language)
-        if structured_data.get("top_topics"):
-            for topic in structured_data["top_topics"]:
-                topic["topic"] = enforce_language(topic.get("topic", ""), language)
-                topic["description"] = enforce_language(topic.get("description", ""), language)
-        if structured_data.get("summary"):
-            structured_data["summary"] = enforce_language(structured_data["summary"], language)
-        if structured_data.get("new_things"):
-            structured_data["new_things"] = [enforce_language(thing, language) for thing in structured_data["new_things"]]
-    
     return structured_data
 
-def generate_graph_based_summary(video_id: str, style: str, word_count: int, language: str = "english") -> str:
-    with neo4j_driver.session() as session:
+async def stream_structured_summary(video_id: str, transcript_text: str, transcript_data: List[Dict], style: str, word_count: int):
+    """Stream the English structured summary, yielding ("delta", "summary", text) and ("field", name, value) events.
+    
+    The model stream is read by its own task, bounded by SUMMARY_TIMEOUT_SECONDS (504) and timed
+    as the "summary" stage from request to last chunk, however slowly the client reads the events.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def consume():
+        structured_prompt = await build_structured_prompt(video_id, transcript_text, transcript_data, style, word_count)
+        with span("summary"):
+            # JSON mode cannot be combined with streaming, so the prompt alone asks for JSON
+            stream = await router.create(
+                "summary",
+                messages=[{"role": "user", "content": structured_prompt}],
+                temperature=0.7,
+                stream=True
+            )
+            
+            parser = JsonFieldStream(stream_keys=["summary"])
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    for kind, name, value in parser.feed(delta):
+                        if kind == "field" and name == "top_topics":
+                            await run_blocking(resolve_topic_timestamps, value, transcript_data)
+                        events.put_nowait((kind, name, value))
+            
+            # Recover whatever the incremental parser could not, e.g. output that was not clean JSON
+            if not parser.complete:
+                for name, value in parse_structured_summary(parser.buffer).items():
+                    if name not in parser.fields:
+                        if name == "top_topics":
+                            await run_blocking(resolve_topic_timestamps, value, transcript_data)
+                        events.put_nowait(("field", name, value))
+    
+    task = asyncio.ensure_future(run_stage("Summary generation", consume(), SUMMARY_TIMEOUT_SECONDS))
+    # Queued after every event, once the stream is done, failed or timed out
+    task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        task.result()
+    finally:
+        # The client may have gone away mid-stream
+        task.cancel()
+
+@traced("graph_summary")
+async def generate_graph_based_summary(video_id: str, style: str, word_count: int, language: str = "english") -> str:
+    async with get_neo4j_driver().session() as session:
         # Get the transcript and key entities
-        result = session.run("""
-            MATCH (v:Video {video_id: $video_id})
-            OPTIONAL MATCH (v)-[:HAS_ENTITY]->(e)
-            WITH v, collect(DISTINCT e.name) as entities
-            RETURN v.transcript as transcript, entities
-        """, video_id=video_id)
-        
-        data = result.single()
+        with timer(NEO4J_QUERY_SECONDS, query="video_entities"):
+            result = await session.run("""
+                MATCH (v:Video {video_id: $video_id})
+                OPTIONAL MATCH (v)-[:HAS_ENTITY]->(e)
+                WITH v, collect(DISTINCT e.name) as entities
+                RETURN v.transcript as legacy_transcript, entities
+            """, video_id=video_id)
+            
+            data = await result.single()
         if not data:
             raise HTTPException(status_code=404, detail="Video not found in knowledge graph")
         
-        transcript = data["transcript"]
+        # Transcripts live in the transcript store; nodes created before it still carry them inline
+        transcript_data = await load_compacted_transcript(video_id)
+        if transcript_data is None:
+            transcript_data = segments_from_text(data["legacy_transcript"] or "")
+        transcript_text = TextFormatter().format_transcript(transcript_data)
+        
+        # Long transcripts are condensed into section notes (map-reduce)
+        transcript = await condense_transcript(video_id, transcript_text, transcript_data)
         entities = data["entities"]
         
         # Get key relationships
-        relationships = session.run("""
-            MATCH (v:Video {video_id: $video_id})-[:HAS_ENTITY]->(e1)-[r:RELATES_TO]->(e2)
-            RETURN e1.name as from, r.type as relationship, e2.name as to
-        """, video_id=video_id)
-        
-        relationships_text = "\n".join([
-            f"- {rel['from']} {rel['relationship']} {rel['to']}"
-            for rel in relationships
-        ])
+        with timer(NEO4J_QUERY_SECONDS, query="video_relationships"):
+            relationships = await session.run("""
+                MATCH (v:Video {video_id: $video_id})-[:HAS_ENTITY]->(e1)-[r:RELATES_TO]->(e2)
+                RETURN e1.name as from, r.type as relationship, e2.name as to
+            """, video_id=video_id)
+            
+            relationships_text = "\n".join([
+                f"- {rel['from']} {rel['relationship']} {rel['to']}"
+                async for rel in relationships
+            ])
 
         # Generate summary first
         summary_prompt = f"""
@@ -389,9 +1207,9 @@ def generate_graph_based_summary(video_id: str, style: str, word_count: int, lan
         Focus on the main topics and their relationships, ensuring the summary is {style} in nature.
         """
         
-        summary_response = groq_client.chat.completions.create(
+        summary_response = await router.create(
+            "graph_summary",
             messages=[{"role": "user", "content": summary_prompt}],
-            model=GROQ_MODEL,
             temperature=0.7,
         )
         
@@ -399,160 +1217,940 @@ def generate_graph_based_summary(video_id: str, style: str, word_count: int, lan
         
         # Enforce the target language
         if language.lower() != "english":
-            summary = enforce_language(summary, language)
+            summary = (await translate_fields({"summary": summary}, language)).get("summary", summary)
         
         return summary
 
-def answer_question_with_graph(video_id: str, question: str, language: str = "english") -> str:
-    with neo4j_driver.session() as session:
-        # Get relevant entities and relationships based on the question
-        result = session.run("""
-            MATCH (v:Video {video_id: $video_id})
-            OPTIONAL MATCH (v)-[:HAS_ENTITY]->(e1)-[r:RELATES_TO]->(e2)
-            WITH v, collect(DISTINCT {from: e1.name, rel: r.type, to: e2.name}) as relationships
-            RETURN v.transcript as transcript, relationships
-        """, video_id=video_id)
-        
-        data = result.single()
-        if not data:
-            raise HTTPException(status_code=404, detail="Video not found in knowledge graph")
-        
-        transcript = data["transcript"]
-        relationships = data["relationships"]
-        
-        relationships_text = "\n".join([
-            f"- {rel['from']} {rel['rel']} {rel['to']}"
-            for rel in relationships
-        ])
+# Retrieval settings for /ask-question: only the best matching segments go into the prompt
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+RETRIEVAL_SEGMENT_CHARS = int(os.getenv("RETRIEVAL_SEGMENT_CHARS", "600"))
+RETRIEVAL_MAX_TRIPLES = int(os.getenv("RETRIEVAL_MAX_TRIPLES", "10"))
+RETRIEVAL_INDEX_CACHE_SIZE = int(os.getenv("RETRIEVAL_INDEX_CACHE_SIZE", "64"))
+# Seconds of transcript included around a time the question mentions ("what is said at 12:30?")
+RETRIEVAL_MOMENT_SECONDS = float(os.getenv("RETRIEVAL_MOMENT_SECONDS", "90"))
+
+# Built BM25 indexes, most recently used last
+_retrieval_indexes: "OrderedDict[str, TranscriptIndex]" = OrderedDict()
+
+def _remember_index(video_id: str, index: TranscriptIndex):
+    _retrieval_indexes[video_id] = index
+    _retrieval_indexes.move_to_end(video_id)
+    while len(_retrieval_indexes) > RETRIEVAL_INDEX_CACHE_SIZE:
+        _retrieval_indexes.popitem(last=False)
+
+async def build_retrieval_index(video_id: str, transcript_data: List[Dict]) -> TranscriptIndex:
+    """Build the per-video retrieval index and persist its segments (done once at ingest)"""
+    index = await run_blocking(TranscriptIndex.from_transcript, transcript_data, RETRIEVAL_SEGMENT_CHARS)
+    await cache_set(make_cache_key("retrieval_segments", video_id, RETRIEVAL_SEGMENT_CHARS), index.segments)
+    _remember_index(video_id, index)
+    return index
+
+async def get_retrieval_index(video_id: str) -> Optional[TranscriptIndex]:
+    index = _retrieval_indexes.get(video_id)
+    if index is not None:
+        _retrieval_indexes.move_to_end(video_id)
+        return index
+    
+    segments = await cache_get(make_cache_key("retrieval_segments", video_id, RETRIEVAL_SEGMENT_CHARS))
+    if segments is None:
+        return None
+    index = await run_blocking(TranscriptIndex, segments)
+    _remember_index(video_id, index)
+    return index
 
-        # Generate answer first in English
-        answer_prompt = f"""
+def question_excerpts(index: TranscriptIndex, question: str) -> List[Dict]:
+    """Top-k segments for the question, plus the stretch of transcript around any time it mentions"""
+    excerpts = index.search(question, RETRIEVAL_TOP_K)
+    times = find_time_references(question)
+    if not times:
+        return excerpts
+    
+    # Two times are a range ("between 10:00 and 12:00"), one is a moment with some context around it
+    if len(times) >= 2:
+        start, end = min(times[:2]), max(times[:2])
+    else:
+        start, end = times[0] - RETRIEVAL_MOMENT_SECONDS / 2, times[0] + RETRIEVAL_MOMENT_SECONDS / 2
+    timeline = TimestampIndex(index.segments)
+    in_range = {segment["start"] for segment in timeline.range(start, max(end, start + 1))}
+    selected = [segment for segment in index.segments if segment.get("start") in in_range]
+    seen = {segment.get("start") for segment in selected}
+    selected.extend(segment for segment in excerpts if segment.get("start") not in seen)
+    return sorted(selected, key=lambda segment: segment.get("start") or 0)
+
+def format_excerpts(segments: List[Dict]) -> str:
+    lines = []
+    for segment in segments:
+        if segment.get("start") is not None:
+            lines.append(f"[{format_timestamp(segment['start'])} - {format_timestamp(segment['end'])}] {segment['text']}")
+        else:
+            lines.append(segment["text"])
+    return "\n".join(lines)
+
+def build_answer_prompt(question: str, relationships_text: str, context: str, context_label: str = "Relevant transcript excerpts", history: str = "") -> str:
+    history_text = f"""
+        Conversation so far (answer follow-up questions in its context):
+        {history}
+        """ if history else ""
+    return f"""
         Answer this question based on the video content and knowledge graph: {question}
         
         Use these relationships from the knowledge graph to provide context:
         {relationships_text}
         
-        Full transcript:
-        {transcript}
-        
+        {context_label}:
+        {context}
+        {history_text}
         Provide a clear and concise answer, using the knowledge graph relationships to support your response.
         """
+
+def build_batch_answer_prompt(questions: List[str], relationships_text: str, context: str, history: str = "") -> str:
+    numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+    history_text = f"""
+Conversation so far (answer follow-up questions in its context):
+{history}
+""" if history else ""
+    return f"""Answer each of these questions based on the video content and knowledge graph:
+{numbered}
+
+Use these relationships from the knowledge graph to provide context:
+{relationships_text}
+
+Relevant transcript excerpts:
+{context}
+{history_text}
+Give each answer clearly and concisely, using the knowledge graph relationships to support it.
+Return ONLY valid JSON, no markdown formatting or extra text:
+{{"answers": ["answer to question 1", "answer to question 2", ...]}}
+with exactly {len(questions)} answers, in the order of the questions.
+"""
+
+async def _graph_context(video_id: str):
+    """The video's relationships and retrieval index, read from Neo4j"""
+    async with get_neo4j_driver().session() as session:
+        # Get relevant entities and relationships based on the question
+        with timer(NEO4J_QUERY_SECONDS, query="video_relationships"):
+            result = await session.run("""
+                MATCH (v:Video {video_id: $video_id})
+                OPTIONAL MATCH (v)-[:HAS_ENTITY]->(e1)-[r:RELATES_TO]->(e2)
+                WITH v, collect(DISTINCT {from: e1.name, rel: r.type, to: e2.name}) as relationships
+                RETURN relationships
+            """, video_id=video_id)
+            
+            data = await result.single()
+        if not data:
+            raise HTTPException(status_code=404, detail="Video not found in knowledge graph")
         
-        answer_response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": answer_prompt}],
-            model=GROQ_MODEL,
+        index = await get_retrieval_index(video_id)
+        if index is None:
+            # Videos ingested before the index existed get it built once, here
+            transcript_data = await load_compacted_transcript(video_id)
+            if transcript_data is None:
+                # Legacy node that still carries its transcript inline
+                with timer(NEO4J_QUERY_SECONDS, query="legacy_transcript"):
+                    result = await session.run("""
+                        MATCH (v:Video {video_id: $video_id})
+                        RETURN v.transcript as transcript
+                    """, video_id=video_id)
+                    record = await result.single()
+                transcript_data = segments_from_text(record["transcript"] or "")
+            index = await build_retrieval_index(video_id, transcript_data)
+    return data["relationships"], index
+
+async def _transcript_context(video_id: str):
+    """Degraded mode: no relationships, only the retrieval index over the stored transcript"""
+    index = await get_retrieval_index(video_id)
+    if index is None:
+        transcript_data = await load_compacted_transcript(video_id)
+        if transcript_data is None:
+            raise GraphUnavailable()
+        index = await build_retrieval_index(video_id, transcript_data)
+    return [], index
+
+# Loaded Q&A context per video (graph relationships and retrieval index), reused across questions
+QA_CONTEXT_CACHE_SIZE = int(os.getenv("QA_CONTEXT_CACHE_SIZE", "128"))
+QA_CONTEXT_TTL_SECONDS = float(os.getenv("QA_CONTEXT_TTL_SECONDS", "600"))
+# Excerpts sent for a batch of questions, pooled from each question's top matches
+QA_BATCH_MAX_EXCERPTS = int(os.getenv("QA_BATCH_MAX_EXCERPTS", "12"))
+
+_qa_contexts: "OrderedDict[str, tuple]" = OrderedDict()
+
+async def load_qa_context(video_id: str):
+    """Relationships and retrieval index for a video, from the in-memory cache or Neo4j"""
+    entry = _qa_contexts.get(video_id)
+    if entry is not None and entry[0] > time.monotonic():
+        _qa_contexts.move_to_end(video_id)
+        return entry[1], entry[2]
+    
+    relationships, index = None, None
+    if graph_available():
+        try:
+            relationships, index = await _graph_context(video_id)
+        except Exception as e:
+            if not is_graph_outage(e):
+                raise
+            mark_graph_down(e)
+    if index is None:
+        # Degraded context is not cached, so the relationships are picked up once Neo4j is back
+        return await _transcript_context(video_id)
+    
+    relationships = [rel for rel in relationships if rel.get("from")]
+    _qa_contexts[video_id] = (time.monotonic() + QA_CONTEXT_TTL_SECONDS, relationships, index)
+    _qa_contexts.move_to_end(video_id)
+    while len(_qa_contexts) > QA_CONTEXT_CACHE_SIZE:
+        _qa_contexts.popitem(last=False)
+    return relationships, index
+
+def format_history(history: Optional[List[Dict]]) -> str:
+    return "\n".join(f"Q: {turn['question']}\nA: {turn['answer']}" for turn in history or [])
+
+def _parse_batch_answers(content: str, count: int) -> Optional[List[str]]:
+    try:
+        answers = json.loads(content).get("answers")
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    if not all(isinstance(answer, str) and answer.strip() for answer in answers):
+        return None
+    return [answer.strip() for answer in answers]
+
+@traced("answer")
+async def answer_questions(video_id: str, questions: List[str], language: str = "english", history: Optional[List[Dict]] = None) -> List[str]:
+    """Answer one or more questions about a video; several questions share one LLM call"""
+    relationships, index = await load_qa_context(video_id)
+    history_text = format_history(history)
+    # A follow-up such as "why?" retrieves better together with the question before it
+    previous = history[-1]["question"] if history else ""
+    
+    # Only the top-k transcript segments and the triples that relate to them go into the prompt
+    excerpts = {}
+    for question in questions:
+        for segment in question_excerpts(index, f"{question} {previous}".strip()):
+            excerpts.setdefault(segment.get("start"), segment)
+    selected = list(excerpts.values())
+    if len(questions) > 1:
+        selected = selected[:QA_BATCH_MAX_EXCERPTS]
+    context = format_excerpts(sorted(selected, key=lambda segment: segment.get("start") or 0))
+    relevant = rank_triples(relationships, " ".join(questions), RETRIEVAL_MAX_TRIPLES, context)
+    
+    relationships_text = "\n".join([
+        f"- {rel['from']} {rel['rel']} {rel['to']}"
+        for rel in relevant
+    ])
+    
+    # Generate answers first in English
+    if len(questions) == 1:
+        answer_response = await router.create(
+            "answer",
+            priority=INTERACTIVE,
+            messages=[{"role": "user", "content": build_answer_prompt(
+                questions[0], relationships_text, context, history=history_text
+            )}],
             temperature=0.5,
         )
+        answers = [answer_response.choices[0].message.content.strip()]
+    else:
+        answer_response = await router.create(
+            "answer",
+            validate=lambda response: _parse_batch_answers(response.choices[0].message.content, len(questions)),
+            priority=INTERACTIVE,
+            messages=[{"role": "user", "content": build_batch_answer_prompt(
+                questions, relationships_text, context, history_text
+            )}],
+            temperature=0.5,
+            response_format={"type": "json_object"},
+        )
+        answers = _parse_batch_answers(answer_response.choices[0].message.content, len(questions))
+        if answers is None:
+            # The model did not return one answer per question; answer them one at a time
+            answers = [
+                (await answer_questions(video_id, [question], "english", history))[0]
+                for question in questions
+            ]
+    
+    # Enforce the target language, all answers in one batched translation
+    if language.lower() != "english":
+        translated = await translate_fields(
+            {f"answer.{i}": answer for i, answer in enumerate(answers)}, language, INTERACTIVE
+        )
+        answers = [translated.get(f"answer.{i}", answer) for i, answer in enumerate(answers)]
+    
+    return answers
+
+async def answer_question_with_graph(video_id: str, question: str, language: str = "english") -> str:
+    return (await answer_questions(video_id, [question], language))[0]
+
+# Speech to text uploads: multipart parts and raw bodies are spooled in memory up to
+# SPEECH_SPOOL_MEMORY_BYTES, then to a temporary file, and handed to Groq as a file object
+SPEECH_MAX_UPLOAD_BYTES = int(os.getenv("SPEECH_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+SPEECH_SPOOL_MEMORY_BYTES = int(os.getenv("SPEECH_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+
+@traced("speech_to_text")
+async def transcribe_audio(audio_file, language: str) -> Dict:
+    """Transcribe audio given as Groq file content: (filename, bytes or file object)"""
+    try:
+        # Audio has its own Groq limits and is not scheduled; keep the client's own retries for it
+        transcription = await get_groq_client().with_options(max_retries=2).audio.transcriptions.create(
+            file=audio_file,
+            model="distil-whisper-large-v3-en",
+            response_format="verbose_json",
+        )
         
-        answer = answer_response.choices[0].message.content.strip()
-        
-        # Enforce the target language
+        # If language is not English, translate the transcription
+        text = transcription.text
         if language.lower() != "english":
-            answer = enforce_language(answer, language)
+            text = await enforce_language(text, language, INTERACTIVE)
         
-        return answer
+        return {
+            "success": True,
+            "text": text.strip()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
 
 @app.post("/speech-to-text")
 async def speech_to_text(request: SpeechToTextRequest):
     try:
         # Decode base64 audio data
         audio_bytes = base64.b64decode(request.audio_data.split(',')[1] if ',' in request.audio_data else request.audio_data)
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.m4a', delete=False) as temp_audio:
-            temp_audio.write(audio_bytes)
-            temp_audio_path = temp_audio.name
-        
-        try:
-            # Transcribe using Groq's API
-            with open(temp_audio_path, "rb") as audio_file:
-                transcription = groq_client.audio.transcriptions.create(
-                    file=(temp_audio_path, audio_file.read()),
-                    model="distil-whisper-large-v3-en",
-                    response_format="verbose_json",
-                )
-            
-            # Clean up temp file
-            os.unlink(temp_audio_path)
-            
-            # If language is not English, translate the transcription
-            text = transcription.text
-            if request.language.lower() != "english":
-                text = enforce_language(text, request.language)
-            
-            return {
-                "success": True,
-                "text": text.strip()
-            }
-        except Exception as e:
-            if os.path.exists(temp_audio_path):
-                os.unlink(temp_audio_path)
-            raise HTTPException(status_code=500, detail=f"Error transcribing audio: {str(e)}")
-        
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing audio: {str(e)}")
+    
+    # The decoded bytes go straight to Groq, no temporary file round trip
+    return await transcribe_audio(("audio.m4a", audio_bytes), request.language)
+
+@app.post("/speech-to-text/upload")
+async def speech_to_text_upload(audio: UploadFile = File(...), language: str = Form("english")):
+    """Multipart upload; the spooled part is streamed to Groq without being read into memory first"""
+    if audio.size is not None and audio.size > SPEECH_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Audio file is too large")
+    try:
+        return await transcribe_audio((audio.filename or "audio.m4a", audio.file), language)
+    finally:
+        await audio.close()
+
+@app.post("/speech-to-text/raw")
+async def speech_to_text_raw(request: Request, language: str = "english", filename: str = "audio.m4a"):
+    """Raw audio request body (e.g. Content-Type: audio/m4a), spooled as it arrives"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPEECH_SPOOL_MEMORY_BYTES)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > SPEECH_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Audio file is too large")
+            if size > SPEECH_SPOOL_MEMORY_BYTES:
+                # Past the in-memory limit the spool is on disk, so keep writes off the event loop
+                await run_blocking(spool.write, chunk)
+            else:
+                spool.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Error processing audio: empty request body")
+        spool.seek(0)
+        return await transcribe_audio((filename, spool), language)
+    finally:
+        spool.close()
 
-def get_video_title(video_id: str) -> str:
+@traced("video_title")
+async def get_video_title(video_id: str) -> str:
     """Fetch video title from YouTube using oEmbed API"""
     try:
-        oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-        response = httpx.get(oembed_url, timeout=10)
+        async with youtube_pool.slot():
+            response = await get_http_client().get(
+                YOUTUBE_OEMBED_URL,
+                params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"},
+            )
         if response.status_code == 200:
             data = response.json()
             return data.get("title", "YouTube Video")
+        if response.status_code == 429:
+            youtube_pool.back_off(YOUTUBE_BLOCKED_BACKOFF_SECONDS)
+        elif response.status_code in (400, 401, 403, 404):
+            # Private, deleted or invalid video: remember the placeholder instead of asking again
+            await cache_set(make_cache_key("title", video_id), "YouTube Video", ttl_seconds=NEGATIVE_CACHE_TTL_SECONDS)
     except Exception as e:
         print(f"Error fetching video title: {str(e)}")
     return "YouTube Video"
 
+async def get_video_title_cached(video_id: str) -> str:
+    """Video title from the result cache, falling back to oEmbed within TITLE_TIMEOUT_SECONDS"""
+    title_key = make_cache_key("title", video_id)
+    video_title = await cache_get(title_key)
+    if video_title is not None:
+        return video_title
+    
+    try:
+        video_title = await asyncio.wait_for(get_video_title(video_id), TITLE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"Timed out fetching video title for {video_id}")
+        return "YouTube Video"
+    
+    if video_title != "YouTube Video":
+        await cache_set(title_key, video_title)
+    return video_title
+
+# Imported on first fetch to keep startup fast; the load test swaps in a stand-in
+YouTubeTranscriptApi = None
+# One client for every fetch, so its session keeps connections to YouTube alive
+_transcript_api = None
+
+def fetch_transcript(video_id: str) -> List[Dict]:
+    """Fetch raw transcript segments (blocking, run it through run_blocking)"""
+    global YouTubeTranscriptApi, _transcript_api
+    if YouTubeTranscriptApi is None:
+        from youtube_transcript_api import YouTubeTranscriptApi
+    if not isinstance(_transcript_api, YouTubeTranscriptApi):
+        _transcript_api = YouTubeTranscriptApi(http_client=pooled_session(YOUTUBE_MAX_CONCURRENCY))
+    return _transcript_api.fetch(video_id).to_raw_data()
+
+@traced("transcript_fetch")
+async def _fetch_and_cache_transcript(video_id: str) -> List[Dict]:
+    try:
+        async with youtube_pool.slot():
+            transcript_data = await run_blocking(fetch_transcript, video_id)
+    except Exception as e:
+        if is_unavailable(e):
+            await cache_set(make_cache_key("no_transcript", video_id), str(e), ttl_seconds=NEGATIVE_CACHE_TTL_SECONDS)
+        elif is_blocked(e):
+            youtube_pool.back_off(YOUTUBE_BLOCKED_BACKOFF_SECONDS)
+        raise
+    # The store keeps the segments as fetched, so compaction can change without refetching
+    await run_blocking(transcript_store.put, video_id, transcript_data)
+    await cache_set(make_cache_key("transcript", video_id), transcript_data)
+    return transcript_data
+
+async def get_raw_transcript(video_id: str) -> List[Dict]:
+    """Transcript segments from the cache or store, fetching from YouTube at most once at a time per video.
+    
+    400 when the video has no transcript (remembered for NEGATIVE_CACHE_TTL_SECONDS), 503 while
+    YouTube is throttling us and 502 when the fetch fails otherwise. Stored segments without
+    timings are replaced by the timed transcript, and only served when it cannot be fetched.
+    """
+    transcript_data = await load_stored_transcript(video_id)
+    if transcript_data is not None and has_timings(transcript_data):
+        return transcript_data
+    untimed = transcript_data
+    unavailable = await cache_get(make_cache_key("no_transcript", video_id))
+    if unavailable is not None:
+        if untimed is not None:
+            return untimed
+        raise HTTPException(status_code=400, detail=f"Could not fetch video transcript: {unavailable}")
+    
+    try:
+        return await request_flight.do(
+            f"transcript:{video_id}",
+            lambda: _fetch_and_cache_transcript(video_id),
+            lookup=lambda: load_timed_transcript(video_id),
+        )
+    except Exception as e:
+        if untimed is not None:
+            return untimed
+        if is_unavailable(e):
+            status_code = 400
+        elif is_blocked(e):
+            status_code = 503
+        else:
+            status_code = 502
+        raise HTTPException(status_code=status_code, detail=f"Could not fetch video transcript: {str(e)}")
+
+def _compact_with_stats(transcript_data: List[Dict]):
+    compacted = compact_transcript(transcript_data)
+    return compacted, compaction_stats(transcript_data, compacted)
+
+async def _compact_and_cache(video_id: str, transcript_data: List[Dict]) -> List[Dict]:
+    compacted, stats = await run_blocking(_compact_with_stats, transcript_data)
+    TRANSCRIPT_CHARS.inc(stats["chars"], stage="raw")
+    TRANSCRIPT_CHARS.inc(stats["compacted_chars"], stage="compacted")
+    # Untimed segments are kept out of the cache, so the timed transcript replaces them once fetched
+    if has_timings(transcript_data):
+        await cache_set(make_cache_key("compact_transcript", video_id, COMPACTION_VERSION), compacted)
+    return compacted
+
+async def load_compacted_transcript(video_id: str) -> Optional[List[Dict]]:
+    """get_transcript without fetching from YouTube: None when the raw transcript is not stored"""
+    compacted = await cache_get(make_cache_key("compact_transcript", video_id, COMPACTION_VERSION))
+    if compacted is not None:
+        return compacted
+    transcript_data = await load_stored_transcript(video_id)
+    if transcript_data is None:
+        return None
+    return await _compact_and_cache(video_id, transcript_data)
+
+async def get_transcript(video_id: str) -> List[Dict]:
+    """Compacted transcript segments, which every prompt and index is built from; compacted once per video.
+    
+    Caption repeats, [Music]-style markers and hesitations are removed. Each segment keeps
+    its original start time, so timestamps still point into the video. The raw segments stay
+    in the transcript store.
+    """
+    compacted = await cache_get(make_cache_key("compact_transcript", video_id, COMPACTION_VERSION))
+    if compacted is not None:
+        return compacted
+    return await _compact_and_cache(video_id, await get_raw_transcript(video_id))
+
+async def keep_raw_transcript(video_id: str):
+    """Make sure the transcript store holds the video's raw segments, e.g. for videos cached before it"""
+    if not await run_blocking(transcript_store.has, video_id):
+        await run_blocking(transcript_store.put, video_id, await get_raw_transcript(video_id))
+
+def make_video_response(video_id: str, video_title: str, structured_data: Dict) -> VideoResponse:
+    return VideoResponse(
+        success=True,
+        video_id=video_id,
+        video_title=video_title,
+        summary=structured_data.get("summary", ""),
+        tags=structured_data.get("tags", []),
+        key_takeaway=structured_data.get("key_takeaway", ""),
+        key_points=structured_data.get("key_points", []),
+        how_it_started=structured_data.get("how_it_started", ""),
+        top_topics=structured_data.get("top_topics", []),
+        new_things=structured_data.get("new_things", []),
+        message="Video processed successfully"
+    )
+
+def summary_cache_key(request: VideoRequest, video_id: str) -> str:
+    return make_cache_key(
+        "summary", video_id, request.style, request.word_count, request.language.lower(), GROQ_MODEL
+    )
+
+# Variants: a new style, length or language for a video that was already summarized is derived
+# from the cached English result (and section notes) instead of re-reading the whole transcript
+SUMMARY_VARIANTS = os.getenv("SUMMARY_VARIANTS", "1").lower() in ("1", "true", "yes")
+# How much longer than the source summary a variant may be before section notes are needed
+SUMMARY_VARIANT_MAX_EXPANSION = float(os.getenv("SUMMARY_VARIANT_MAX_EXPANSION", "1.5"))
+
+def english_summary_key(video_id: str, style: str, word_count: int) -> str:
+    return make_cache_key("summary_english", video_id, style, word_count, GROQ_MODEL)
+
+def summary_source_key(video_id: str) -> str:
+    return make_cache_key("summary_source", video_id, GROQ_MODEL)
+
+def _word_count(text) -> int:
+    return len(str(text or "").split())
+
+async def remember_english_summary(video_id: str, style: str, word_count: int, structured_data: Dict):
+    """Keep the untranslated result for variants; the longest summary per video becomes their source"""
+    english = copy.deepcopy(structured_data)
+    await cache_set(english_summary_key(video_id, style, word_count), english)
+    source = await cache_get(summary_source_key(video_id))
+    if source is None or _word_count(english.get("summary")) > _word_count(source["structured"].get("summary")):
+        await cache_set(summary_source_key(video_id), {"style": style, "word_count": word_count, "structured": english})
+
+def build_variant_prompt(source: Dict, notes: Optional[str], style: str, word_count: int) -> str:
+    structured = source["structured"]
+    topics = "\n".join(
+        f"- {topic.get('timestamp', '')} {topic.get('topic', '')}: {topic.get('description', '')}"
+        for topic in structured.get("top_topics") or [] if isinstance(topic, dict)
+    )
+    material = f"""Key takeaway: {structured.get("key_takeaway", "")}
+
+How it started: {structured.get("how_it_started", "")}
+
+Key points:
+{chr(10).join(f"- {point}" for point in structured.get("key_points") or [])}
+
+Topics:
+{topics}
+
+New or interesting things:
+{chr(10).join(f"- {item}" for item in structured.get("new_things") or [])}
+
+Existing {source["style"]} summary:
+{structured.get("summary", "")}"""
+    if notes:
+        material += f"\n\n{notes}"
+    
+    return f"""Rewrite the summary of a video, using only the material below, which was extracted from its transcript.
+
+{material}
+
+Write a comprehensive {style} summary of approximately {word_count} words covering the entire video.
+Make the summary {style} in nature. Return only the summary text, no heading, markdown fences or notes.
+"""
+
+async def derive_summary_variant(video_id: str, style: str, word_count: int, language: str) -> Optional[Dict]:
+    """Structured summary for new parameters from cached results, or None if the full pipeline is needed.
+    
+    Only the summary text depends on style and length, so it alone is rewritten, from the
+    cached fields (plus the section notes when the new summary is much longer). A new
+    language translates the cached English result.
+    """
+    english = await cache_get(english_summary_key(video_id, style, word_count))
+    if english is None:
+        source = await cache_get(summary_source_key(video_id))
+        if source is None:
+            return None
+        
+        notes = None
+        if word_count > _word_count(source["structured"].get("summary")) * SUMMARY_VARIANT_MAX_EXPANSION:
+            notes = await cache_get(make_cache_key("section_notes", video_id, GROQ_MODEL, CHUNK_CHARS))
+            if notes is None:
+                return None
+        
+        response = await router.create(
+            "summary_variant",
+            validate=lambda response: _word_count(response.choices[0].message.content) >= word_count / 2,
+            messages=[{"role": "user", "content": build_variant_prompt(source, notes, style, word_count)}],
+            temperature=0.7,
+        )
+        english = {**copy.deepcopy(source["structured"]), "summary": response.choices[0].message.content.strip()}
+        await cache_set(english_summary_key(video_id, style, word_count), english)
+    
+    structured_data = copy.deepcopy(english)
+    if language.lower() != "english":
+        structured_data = await translate_structured_summary(structured_data, language)
+    return structured_data
+
+async def _build_video_response(request: VideoRequest, video_id: str, summary_key: str) -> Dict:
+    """Run the full pipeline for one video and parameter set, caching the response"""
+    if SUMMARY_VARIANTS:
+        structured_data = await run_stage("Summary variant", derive_summary_variant(
+            video_id, request.style, request.word_count, request.language
+        ), SUMMARY_TIMEOUT_SECONDS)
+        if structured_data is not None:
+            video_title = await get_video_title_cached(video_id)
+            response = make_video_response(video_id, video_title, structured_data).model_dump()
+            await cache_set(summary_key, response)
+            return response
+    
+    transcript_data = await get_transcript(video_id)
+    formatter = TextFormatter()
+    transcript_text = formatter.format_transcript(transcript_data)
+    
+    # Build the Q&A retrieval index once per video
+    if await get_retrieval_index(video_id) is None:
+        await build_retrieval_index(video_id, transcript_data)
+    
+    try:
+        # Title, knowledge graph and summary are independent, so they run concurrently
+        summary_stage = run_stage("Summary generation", generate_structured_summary(
+            video_id=video_id,
+            transcript_text=transcript_text,
+            transcript_data=transcript_data,
+            style=request.style,
+            word_count=request.word_count,
+            language=request.language
+        ), SUMMARY_TIMEOUT_SECONDS)
+        # Requests for the same video with different parameters share one graph build
+        graph_stage = run_stage("Knowledge graph build", request_flight.do(
+            f"graph:{video_id}",
+            lambda: build_knowledge_graph(video_id, transcript_text, transcript_data)
+        ), GRAPH_TIMEOUT_SECONDS)
+        
+        if GRAPH_BUILD_MODE == "background":
+            spawn_background(graph_stage, name=f"knowledge-graph-{video_id}")
+            video_title, structured_data = await gather_stages(
+                get_video_title_cached(video_id), summary_stage
+            )
+        else:
+            video_title, _, structured_data = await gather_stages(
+                get_video_title_cached(video_id), graph_stage, summary_stage
+            )
+        
+        response = make_video_response(video_id, video_title, structured_data).model_dump()
+        await cache_set(summary_key, response)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing video: {str(e)}")
+
 @app.post("/process-video", response_model=VideoResponse)
 async def process_video(request: VideoRequest):
     try:
         video_id = extract_video_id(request.video_url)
+
+        # Return straight from the cache when this exact summary was already generated
+        summary_key = summary_cache_key(request, video_id)
+        cached = await cache_get(summary_key)
+        if cached is not None:
+            return VideoResponse(**cached)
+
+        # Concurrent identical requests (same video and parameters) share one computation
+        response = await request_flight.do(
+            summary_key,
+            lambda: _build_video_response(request, video_id, summary_key),
+            lookup=lambda: cache_get(summary_key),
+        )
+        return VideoResponse(**response)
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch ingestion of playlists and backfills: progress is checkpointed in SQLite per URL,
+# so a job interrupted by a crash or restart resumes where it stopped
+INGEST_DB_PATH = os.getenv("INGEST_DB_PATH", "ingest.db")
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+INGEST_LEASE_SECONDS = float(os.getenv("INGEST_LEASE_SECONDS", "600"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "2"))
+INGEST_RESUME_ON_STARTUP = os.getenv("INGEST_RESUME_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+# Download a job's transcripts and titles ahead of the workers, at the YouTube fetch concurrency
+INGEST_PREFETCH = os.getenv("INGEST_PREFETCH", "1").lower() in ("1", "true", "yes")
+
+ingest_store = IngestStore(INGEST_DB_PATH)
+ingest_tasks: Dict[str, asyncio.Task] = {}
+
+class IngestRequest(BaseModel):
+    urls: List[str]  # video URLs, or playlist URLs that are expanded to their videos
+    language: str = "english"
+    word_count: int = 300
+    style: str = "normal"
+    job_id: Optional[str] = None
+
+def _playlist_video_urls(url: str) -> List[str]:
+    from pytube import Playlist
+    return list(Playlist(url).video_urls)
+
+async def expand_sources(urls: List[str]) -> List[str]:
+    """Replace playlist URLs with the URLs of their videos"""
+    expanded = []
+    for url in urls:
+        if "/playlist" in url and "list=" in url:
+            try:
+                expanded.extend(await run_blocking(_playlist_video_urls, url))
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Could not read playlist {url}: {str(e)}")
+        else:
+            expanded.append(url)
+    return expanded
+
+async def create_ingest_job(urls: List[str], options: Dict, job_id: Optional[str] = None):
+    """Register a job, returning (job_id, created); the same URLs and options map to the same job"""
+    urls = await expand_sources(urls)
+    if not urls:
+        raise HTTPException(status_code=400, detail="No videos to ingest")
+    job_id = job_id or make_cache_key("ingest", urls, options)[:16]
+    created = await run_blocking(ingest_store.create_job, job_id, urls, options)
+    return job_id, created
+
+async def ingest_video(url: str, options: Dict) -> str:
+    """Graph and summary for one video, shared with /process-video's cache; "skipped" if already cached"""
+    request = VideoRequest(video_url=url, **options)
+    video_id = extract_video_id(url)
+    summary_key = summary_cache_key(request, video_id)
+    if await cache_get(summary_key) is not None:
+        return "skipped"
+    
+    await request_flight.do(
+        summary_key,
+        lambda: _build_video_response(request, video_id, summary_key),
+        lookup=lambda: cache_get(summary_key),
+    )
+    return "done"
+
+async def run_ingest_job(job_id: str, concurrency: Optional[int] = None, on_progress=None) -> Dict:
+    prefetch_task = None
+    if INGEST_PREFETCH:
+        video_ids = []
+        for url in await run_blocking(ingest_store.pending_urls, job_id):
+            try:
+                video_ids.append(extract_video_id(url))
+            except HTTPException:
+                pass  # The worker records the invalid URL
+        prefetch_task = asyncio.create_task(prefetch_videos(video_ids), name=f"prefetch-{job_id}")
+    try:
+        return await run_job(
+            ingest_store,
+            job_id,
+            ingest_video,
+            concurrency=concurrency or INGEST_CONCURRENCY,
+            lease_seconds=INGEST_LEASE_SECONDS,
+            max_attempts=INGEST_MAX_ATTEMPTS,
+            on_progress=on_progress,
+            run_blocking=run_blocking,
+        )
+    finally:
+        if prefetch_task is not None:
+            prefetch_task.cancel()
+
+def start_ingest_job(job_id: str):
+    """Run a job in this worker unless it is already running here"""
+    task = ingest_tasks.get(job_id)
+    if task is not None and not task.done():
+        return
+    task = asyncio.create_task(run_ingest_job(job_id), name=f"ingest-{job_id}")
+    ingest_tasks[job_id] = task
+    task.add_done_callback(lambda done: _on_ingest_done(job_id, done))
+
+def _on_ingest_done(job_id: str, task: asyncio.Task):
+    if ingest_tasks.get(job_id) is task:
+        del ingest_tasks[job_id]
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Ingest job {job_id} failed: {str(task.exception())}")
+
+@app.post("/ingest-jobs", status_code=202)
+async def create_ingest(request: IngestRequest):
+    options = {"language": request.language, "word_count": request.word_count, "style": request.style}
+    job_id, created = await create_ingest_job(request.urls, options, request.job_id)
+    start_ingest_job(job_id)
+    status = await run_blocking(ingest_store.status, job_id)
+    return {**status, "created": created, "active": True}
+
+@app.get("/ingest-jobs/{job_id}")
+async def get_ingest(job_id: str):
+    status = await run_blocking(ingest_store.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return {**status, "active": job_id in ingest_tasks}
+
+# Bulk prefetch of transcripts and titles, e.g. before a batch of /process-video calls
+PREFETCH_MAX_VIDEOS = int(os.getenv("PREFETCH_MAX_VIDEOS", "500"))
+
+class PrefetchRequest(BaseModel):
+    video_ids: List[str] = []
+    video_urls: List[str] = []  # video or playlist URLs
+
+async def prefetch_video(video_id: str) -> Dict:
+    """Title and transcript of one video into the caches; transcript is cached, fetched, unavailable or failed"""
+    result = {"video_id": video_id}
+    
+    async def title():
+        result["title"] = await get_video_title_cached(video_id)
+    
+    async def transcript():
+        if await load_timed_transcript(video_id) is not None:
+            result["transcript"] = "cached"
+            return
         try:
-            yt_api = YouTubeTranscriptApi()
-            transcript_data = yt_api.fetch(video_id).to_raw_data()
-            formatter = TextFormatter()
-            transcript_text = formatter.format_transcript(transcript_data)
+            await get_raw_transcript(video_id)
+            result["transcript"] = "fetched"
+        except HTTPException as e:
+            result["transcript"] = "unavailable" if e.status_code == 400 else "failed"
+            result["error"] = e.detail
+    
+    await asyncio.gather(title(), transcript())
+    return result
+
+async def prefetch_videos(video_ids: List[str]) -> List[Dict]:
+    """Prefetch many videos; the YouTube fetch pool bounds how many requests run at once"""
+    return await asyncio.gather(*(prefetch_video(video_id) for video_id in dict.fromkeys(video_ids)))
+
+@app.post("/prefetch")
+async def prefetch(request: PrefetchRequest):
+    """Fetch transcripts and titles for a list of videos ahead of processing them"""
+    for video_id in request.video_ids:
+        if not VIDEO_ID_PATTERN.match(video_id):
+            raise HTTPException(status_code=400, detail=f"Invalid video ID {video_id!r}")
+    video_ids = list(request.video_ids)
+    video_ids.extend(extract_video_id(url) for url in await expand_sources(request.video_urls))
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="No videos to prefetch")
+    if len(set(video_ids)) > PREFETCH_MAX_VIDEOS:
+        raise HTTPException(status_code=400, detail=f"At most {PREFETCH_MAX_VIDEOS} videos per request")
+    
+    videos = await prefetch_videos(video_ids)
+    counts = {}
+    for video in videos:
+        counts[video["transcript"]] = counts.get(video["transcript"], 0) + 1
+    return {"success": True, "transcripts": counts, "videos": videos}
+
+# Order in which structured summary fields are emitted when they are not streamed live
+STREAM_FIELDS = ["key_takeaway", "key_points", "how_it_started", "top_topics", "tags", "new_things", "summary"]
+
+def format_stream_event(event: str, data, sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+async def _video_events(request: VideoRequest, video_id: str, sse: bool):
+    """Events for /process-video/stream: title, each summary field as it is ready, then done"""
+    summary_key = summary_cache_key(request, video_id)
+    cached = await cache_get(summary_key)
+    if cached is None and SUMMARY_VARIANTS:
+        try:
+            structured_data = await run_stage("Summary variant", derive_summary_variant(
+                video_id, request.style, request.word_count, request.language
+            ), SUMMARY_TIMEOUT_SECONDS)
+        except HTTPException as e:
+            yield format_stream_event("error", {"status_code": e.status_code, "detail": e.detail}, sse)
+            return
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Could not fetch video transcript: {str(e)}")
+            yield format_stream_event("error", {"status_code": 500, "detail": f"Error processing video: {str(e)}"}, sse)
+            return
+        if structured_data is not None:
+            cached = make_video_response(video_id, await get_video_title_cached(video_id), structured_data).model_dump()
+            await cache_set(summary_key, cached)
+    if cached is not None:
+        yield format_stream_event("title", {"video_id": video_id, "video_title": cached["video_title"]}, sse)
+        for name in STREAM_FIELDS:
+            yield format_stream_event(name, cached.get(name), sse)
+        yield format_stream_event("done", cached, sse)
+        return
+    
+    title_task = asyncio.ensure_future(get_video_title_cached(video_id))
+    graph_task = None
+    try:
+        transcript_data = await get_transcript(video_id)
+        transcript_text = TextFormatter().format_transcript(transcript_data)
+        if await get_retrieval_index(video_id) is None:
+            await build_retrieval_index(video_id, transcript_data)
         
-        try:
-            # Get video title
-            video_title = get_video_title(video_id)
-            
-            # Create knowledge graph
-            create_knowledge_graph(video_id, transcript_text)
-            
-            # Generate structured summary
-            structured_data = generate_structured_summary(
+        graph_stage = run_stage("Knowledge graph build", request_flight.do(
+            f"graph:{video_id}",
+            lambda: build_knowledge_graph(video_id, transcript_text, transcript_data)
+        ), GRAPH_TIMEOUT_SECONDS)
+        if GRAPH_BUILD_MODE == "background":
+            spawn_background(graph_stage, name=f"knowledge-graph-{video_id}")
+        else:
+            graph_task = asyncio.ensure_future(graph_stage)
+        
+        video_title = await title_task
+        yield format_stream_event("title", {"video_id": video_id, "video_title": video_title}, sse)
+        
+        structured_data = {}
+        if request.language.lower() == "english":
+            # Fields are forwarded as soon as the model finishes each one; summary tokens pass straight through
+            async for kind, name, value in stream_structured_summary(
+                video_id, transcript_text, transcript_data, request.style, request.word_count
+            ):
+                if kind == "delta":
+                    yield format_stream_event("summary_delta", {"text": value}, sse)
+                else:
+                    structured_data[name] = value
+                    yield format_stream_event(name, value, sse)
+        else:
+            # Translated fields only exist once the batched translation is done
+            structured_data = await run_stage("Summary generation", generate_structured_summary(
                 video_id=video_id,
                 transcript_text=transcript_text,
                 transcript_data=transcript_data,
                 style=request.style,
                 word_count=request.word_count,
                 language=request.language
-            )
-            
-            return VideoResponse(
-                success=True,
-                video_id=video_id,
-                video_title=video_title,
-                summary=structured_data.get("summary", ""),
-                tags=structured_data.get("tags", []),
-                key_takeaway=structured_data.get("key_takeaway", ""),
-                key_points=structured_data.get("key_points", []),
-                how_it_started=structured_data.get("how_it_started", ""),
-                top_topics=structured_data.get("top_topics", []),
-                new_things=structured_data.get("new_things", []),
-                message="Video processed successfully"
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error processing video: {str(e)}")
+            ), SUMMARY_TIMEOUT_SECONDS)
+            for name in STREAM_FIELDS:
+                yield format_stream_event(name, structured_data.get(name), sse)
         
-    except HTTPException as he:
-        raise he
+        if graph_task is not None:
+            await graph_task
+        
+        if request.language.lower() == "english":
+            await remember_english_summary(video_id, request.style, request.word_count, structured_data)
+        response = make_video_response(video_id, video_title, structured_data).model_dump()
+        await cache_set(summary_key, response)
+        yield format_stream_event("done", response, sse)
+    except HTTPException as e:
+        yield format_stream_event("error", {"status_code": e.status_code, "detail": e.detail}, sse)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        yield format_stream_event("error", {"status_code": 500, "detail": f"Error processing video: {str(e)}"}, sse)
+    finally:
+        # The client may have gone away mid-stream
+        for task in (title_task, graph_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+@app.post("/process-video/stream")
+async def process_video_stream(request: VideoRequest, format: str = "ndjson"):
+    """Streaming /process-video: NDJSON lines by default, server-sent events with ?format=sse"""
+    video_id = extract_video_id(request.video_url)
+    sse = format.lower() == "sse"
+    return StreamingResponse(
+        _video_events(request, video_id, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/ask-question", response_model=QuestionResponse)
 async def ask_question(request: QuestionRequest):
@@ -568,7 +2166,7 @@ async def ask_question(request: QuestionRequest):
         
         try:
             # Use knowledge graph for Q&A with language support
-            answer = answer_question_with_graph(
+            answer = await answer_question_with_graph(
                 video_id=video_id,
                 question=question,
                 language=request.language  
@@ -579,6 +2177,9 @@ async def ask_question(request: QuestionRequest):
                 answer=answer,
                 message="Question answered successfully"
             )
+        except HTTPException:
+            # 404 for unknown videos, 503 while the graph is down and the transcript is not stored
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
         
@@ -587,32 +2188,305 @@ async def ask_question(request: QuestionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Q&A sessions: conversation history per session in memory (per worker process), bounded in
+# count and age; the history sent with each question is trimmed to QA_HISTORY_TOKENS
+QA_SESSION_MAX = int(os.getenv("QA_SESSION_MAX", "1000"))
+QA_SESSION_TTL_SECONDS = float(os.getenv("QA_SESSION_TTL_SECONDS", "1800"))
+QA_HISTORY_TOKENS = int(os.getenv("QA_HISTORY_TOKENS", "1500"))
+QA_MAX_BATCH_QUESTIONS = int(os.getenv("QA_MAX_BATCH_QUESTIONS", "10"))
+
+qa_sessions: "OrderedDict[str, Dict]" = OrderedDict()
+
+class QASessionRequest(BaseModel):
+    video_url: str
+    language: str = "english"
+
+class SessionQuestionsRequest(BaseModel):
+    questions: List[str]
+    language: Optional[str] = None  # defaults to the session's language
+
+def get_qa_session(session_id: str) -> Dict:
+    session = qa_sessions.get(session_id)
+    if session is None or session["expires_at"] <= time.monotonic():
+        qa_sessions.pop(session_id, None)
+        raise HTTPException(status_code=404, detail="Q&A session not found or expired")
+    session["expires_at"] = time.monotonic() + QA_SESSION_TTL_SECONDS
+    qa_sessions.move_to_end(session_id)
+    return session
+
+def trim_history(history: List[Dict], budget_tokens: int) -> List[Dict]:
+    """The most recent turns whose combined size fits the token budget"""
+    kept, used = [], 0
+    for turn in reversed(history):
+        used += estimate_tokens(turn["question"]) + estimate_tokens(turn["answer"])
+        if used > budget_tokens:
+            break
+        kept.append(turn)
+    return kept[::-1]
+
+@app.post("/qa-sessions")
+async def create_qa_session(request: QASessionRequest):
+    """Start a Q&A session on a video; its context is loaded now and kept warm for follow-ups"""
+    video_id = extract_video_id(request.video_url)
+    await load_qa_context(video_id)
+    
+    session_id = uuid.uuid4().hex
+    qa_sessions[session_id] = {
+        "video_id": video_id,
+        "language": request.language,
+        "history": [],
+        "expires_at": time.monotonic() + QA_SESSION_TTL_SECONDS,
+    }
+    while len(qa_sessions) > QA_SESSION_MAX:
+        qa_sessions.popitem(last=False)
+    return {"success": True, "session_id": session_id, "video_id": video_id}
+
+@app.post("/qa-sessions/{session_id}/questions")
+async def ask_session_questions(session_id: str, request: SessionQuestionsRequest):
+    """Answer one or more questions in a session, all in a single LLM call"""
+    session = get_qa_session(session_id)
+    questions = [question.strip() for question in request.questions if question.strip()]
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions given")
+    if len(questions) > QA_MAX_BATCH_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {QA_MAX_BATCH_QUESTIONS} questions per request")
+    
+    try:
+        answers = await answer_questions(
+            session["video_id"],
+            questions,
+            request.language or session["language"],
+            trim_history(session["history"], QA_HISTORY_TOKENS),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
+    
+    turns = [{"question": question, "answer": answer} for question, answer in zip(questions, answers)]
+    session["history"].extend(turns)
+    # Older turns could never fit the budget again
+    session["history"] = trim_history(session["history"], QA_HISTORY_TOKENS * 2)
+    return {"success": True, "session_id": session_id, "answers": turns}
+
+@app.get("/qa-sessions/{session_id}")
+async def get_qa_session_history(session_id: str):
+    session = get_qa_session(session_id)
+    return {"success": True, "session_id": session_id, "video_id": session["video_id"], "history": session["history"]}
+
+@app.delete("/qa-sessions/{session_id}")
+async def delete_qa_session(session_id: str):
+    if qa_sessions.pop(session_id, None) is None:
+        raise HTTPException(status_code=404, detail="Q&A session not found or expired")
+    return {"success": True}
+
+class MomentRequest(BaseModel):
+    video_url: str
+    query: str
+
+def find_moment(transcript_data: List[Dict], query: str) -> Optional[Dict]:
+    index = TimestampIndex(transcript_data)
+    match = index.locate(query, window_seconds=TOPIC_MATCH_WINDOW_SECONDS)
+    if match is None:
+        return None
+    seconds, i = match
+    return {"seconds": seconds, "timestamp": format_timestamp(seconds), "text": index.texts[i]}
+
+@app.post("/find-moment")
+async def jump_to_moment(request: MomentRequest):
+    """Where in the video something is said, matched against the transcript without an LLM call"""
+    video_id = extract_video_id(request.video_url)
+    transcript_data = await get_transcript(video_id)
+    moment = await run_blocking(find_moment, transcript_data, request.query)
+    if moment is None:
+        raise HTTPException(status_code=404, detail="No matching moment found in the transcript")
+    return {"success": True, "video_id": video_id, **moment}
+
+# Cross-video queries over the merged Entity nodes. Entity lookups, neighbourhoods and
+# query results are cached in memory; graph writes evict the entities they touch.
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "4096"))
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "300"))
+ENTITY_MAX_HOPS = int(os.getenv("ENTITY_MAX_HOPS", "3"))
+ENTITY_MAX_RESULTS = int(os.getenv("ENTITY_MAX_RESULTS", "100"))
+# Caps that keep queries around heavily connected entities bounded as the library grows
+ENTITY_MAX_EDGES = int(os.getenv("ENTITY_MAX_EDGES", "100"))
+ENTITY_MAX_FRONTIER = int(os.getenv("ENTITY_MAX_FRONTIER", "200"))
+ENTITY_HUB_MAX_VIDEOS = int(os.getenv("ENTITY_HUB_MAX_VIDEOS", "500"))
+
+entity_index = EntityIndex(
+    get_neo4j_driver,
+    cache_size=ENTITY_CACHE_SIZE,
+    ttl_seconds=ENTITY_CACHE_TTL_SECONDS,
+    max_edges=ENTITY_MAX_EDGES,
+    max_frontier=ENTITY_MAX_FRONTIER,
+    hub_max_videos=ENTITY_HUB_MAX_VIDEOS,
+)
+
+registry.collected("vidinsights_entity_cache_entries", "Entries in the entity index cache", "gauge", lambda: [({}, entity_index.metrics()["entries"])])
+registry.collected(
+    "vidinsights_entity_cache_requests_total", "Entity index cache lookups", "counter",
+    lambda: [({"result": "hit"}, entity_index.hits), ({"result": "miss"}, entity_index.misses)],
+)
+
+async def query_entity_index(query):
+    """Run an entity index query, answering 503 while Neo4j is unreachable"""
+    if not graph_available():
+        query.close()
+        raise GraphUnavailable()
+    try:
+        return await query
+    except Exception as e:
+        if not is_graph_outage(e):
+            raise HTTPException(status_code=500, detail=f"Entity query failed: {str(e)}")
+        mark_graph_down(e)
+        raise GraphUnavailable()
+
+def check_limit(limit: int) -> int:
+    if not 1 <= limit <= ENTITY_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {ENTITY_MAX_RESULTS}")
+    return limit
+
+@app.get("/entities/search")
+async def search_entities(q: str, limit: int = 10):
+    """Entities whose names contain every word of q, the last word as a prefix"""
+    entities = await query_entity_index(entity_index.search(q, check_limit(limit)))
+    return {"success": True, "entities": entities}
+
+@app.get("/entities/videos")
+async def entity_videos(name: str, limit: int = 20, offset: int = 0):
+    """Videos mentioning an entity, under any spelling that normalizes to the same name"""
+    result = await query_entity_index(entity_index.videos_for_entity(name, check_limit(limit), max(0, offset)))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Entity not found in knowledge graph")
+    return {"success": True, **result}
+
+@app.get("/entities/related")
+async def related_entities(name: str, hops: int = 2, limit: int = 25):
+    """Entities within hops relationships of an entity, across every video's graph"""
+    if not 1 <= hops <= ENTITY_MAX_HOPS:
+        raise HTTPException(status_code=400, detail=f"hops must be between 1 and {ENTITY_MAX_HOPS}")
+    entities = await query_entity_index(entity_index.related_entities(name, hops, check_limit(limit)))
+    if entities is None:
+        raise HTTPException(status_code=404, detail="Entity not found in knowledge graph")
+    return {"success": True, "entities": entities}
+
+@app.get("/videos/{video_id}/related")
+async def related_videos(video_id: str, limit: int = 10):
+    """Other videos ranked by the entities they share with this one"""
+    videos = await query_entity_index(entity_index.related_videos(video_id, check_limit(limit)))
+    return {"success": True, "video_id": video_id, "videos": videos}
+
 # Define a Pydantic model for the request body
 class TextToSpeechRequest(BaseModel):
     text: str
     lang: str
 
+# Text to speech: sentence-sized segments are synthesized in parallel into memory
+# and cached by content hash, so a repeated summary is never synthesized twice
+TTS_CACHE_PATH = os.getenv("TTS_CACHE_PATH", "tts_cache.db")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+TTS_SEGMENT_CHARS = int(os.getenv("TTS_SEGMENT_CHARS", "300"))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+
+tts_cache = ResultCache(
+    TTS_CACHE_PATH,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    max_bytes=TTS_CACHE_MAX_BYTES,
+    memory_entries=64,
+)
+_tts_semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+# Sentence ends, including the Devanagari danda used in Hindi summaries
+SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+def split_sentences(text: str, max_chars: int = TTS_SEGMENT_CHARS) -> List[str]:
+    """Split text into segments of whole sentences of at most about max_chars characters"""
+    segments, current = [], ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+# gTTS is imported on first use to keep startup fast; the load test swaps in a stand-in
+gTTS = None
+_tts_langs: Optional[Dict[str, str]] = None
+
+def tts_langs() -> Dict[str, str]:
+    global _tts_langs
+    if _tts_langs is None:
+        from gtts.lang import tts_langs as gtts_langs
+        _tts_langs = gtts_langs()
+    return _tts_langs
+
+def _synthesize_segment(text: str, lang: str) -> bytes:
+    global gTTS
+    if gTTS is None:
+        from gtts import gTTS
+    # gTTS writes MP3 frames into the buffer; nothing touches the filesystem
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+async def synthesize_segment(text: str, lang: str) -> bytes:
+    key = make_cache_key("tts", lang, text)
+    audio = await cache_get(key, cache=tts_cache)
+    if audio is None:
+        async with _tts_semaphore:
+            # gTTS has no async API, so synthesis runs on the bounded thread pool
+            with span("text_to_speech"):
+                audio = await run_blocking(_synthesize_segment, text, lang)
+        await cache_set(key, audio, cache=tts_cache)
+    return audio
+
+def prepare_speech(request: TextToSpeechRequest) -> List[str]:
+    if request.lang not in tts_langs():
+        raise HTTPException(status_code=400, detail=f"Unsupported language for speech: {request.lang}")
+    segments = split_sentences(request.text)
+    if not segments:
+        raise HTTPException(status_code=400, detail="No text to synthesize")
+    return segments
+
+async def stream_speech(tasks: List[asyncio.Task]):
+    """MP3 bytes segment by segment, in order; later segments synthesize while earlier ones are sent"""
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
 # test to speech route
 @app.post("/text-to-speech")
 async def text_to_speech(request: TextToSpeechRequest):
+    segments = prepare_speech(request)
     try:
-        # Create a gTTS object
-        tts = gTTS(text=request.text, lang=request.lang, slow=False)
-        
-        # Save the audio to a temporary file
-        audio_file = "temp_audio.mp3"
-        tts.save(audio_file)
-        
-        # Read the audio file and encode it to base64
-        with open(audio_file, "rb") as audio:
-            audio_base64 = base64.b64encode(audio.read()).decode('utf-8')
-        
-        # Clean up the temporary file
-        os.remove(audio_file)
-        
-        return {"audioContent": audio_base64}
+        # MP3 frames are self-contained, so segment clips can simply be concatenated
+        audio = b"".join(await asyncio.gather(*(synthesize_segment(segment, request.lang) for segment in segments)))
+        return {"audioContent": base64.b64encode(audio).decode('utf-8')}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/text-to-speech/stream")
+async def text_to_speech_stream(request: TextToSpeechRequest):
+    """Raw audio/mpeg, streamed as each sentence segment is synthesized"""
+    segments = prepare_speech(request)
+    tasks = [asyncio.ensure_future(synthesize_segment(segment, request.lang)) for segment in segments]
+    try:
+        # Wait for the first segment so a synthesis failure still returns a proper error status
+        await asyncio.shield(tasks[0])
     except Exception as e:
+        for task in tasks:
+            task.cancel()
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(stream_speech(tasks), media_type="audio/mpeg")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,120 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from llm_scheduler import NORMAL
+
+
+def parse_routes(value: str) -> Dict[str, Tuple[str, int]]:
+    """Routing table from "task=model[:max_chars],..."; max_chars 0 (or none) means any input size"""
+    routes = {}
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        task, _, target = entry.partition("=")
+        model, _, max_chars = target.strip().partition(":")
+        if not task.strip() or not model:
+            raise ValueError(f"Invalid LLM route {entry!r}, expected task=model[:max_chars]")
+        routes[task.strip()] = (model, int(max_chars or 0))
+    return routes
+
+
+def _prompt_chars(kwargs: Dict) -> int:
+    return sum(len(str(message.get("content") or "")) for message in kwargs.get("messages", []))
+
+
+class ModelRouter:
+    """Picks the chat model for each call by task and prompt size, from a routing table.
+
+    Tasks without a route, and prompts longer than the route's max_chars, go to the default
+    model. When a routed model's output fails the caller's validation, or the call fails,
+    it is retried once on the default model.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        default_model: str,
+        routes: Dict[str, Tuple[str, int]],
+        observer: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self.scheduler = scheduler
+        self.default_model = default_model
+        self.routes = routes
+        # observer(task, model, reason) for every decision; reason is route, size, default or fallback
+        self.observer = observer
+        self._decisions: Dict[str, Dict[str, int]] = {}
+        self._fallbacks: Dict[str, int] = {}
+        self._latency: Dict[str, Dict[str, float]] = {}
+
+    def route(self, task: str, kwargs: Dict) -> Tuple[str, str]:
+        """(model, reason) for a call"""
+        if task not in self.routes:
+            return self.default_model, "default"
+        model, max_chars = self.routes[task]
+        if max_chars and _prompt_chars(kwargs) > max_chars:
+            return self.default_model, "size"
+        return model, "route"
+
+    async def create(
+        self,
+        task: str,
+        validate: Optional[Callable[[Any], bool]] = None,
+        priority: int = NORMAL,
+        **kwargs,
+    ):
+        """Chat completion on the routed model, through the scheduler"""
+        model, reason = self.route(task, kwargs)
+        self._record(task, model, reason)
+        if model == self.default_model:
+            return await self._call(model, priority, kwargs)
+
+        try:
+            response = await self._call(model, priority, kwargs)
+            if validate is None or kwargs.get("stream") or self._valid(validate, response):
+                return response
+            print(f"{model} output for {task} failed validation, retrying on {self.default_model}")
+        except Exception as e:
+            print(f"{model} failed for {task}, retrying on {self.default_model}: {str(e)}")
+
+        self._fallbacks[task] = self._fallbacks.get(task, 0) + 1
+        self._record(task, self.default_model, "fallback")
+        return await self._call(self.default_model, priority, kwargs)
+
+    async def _call(self, model: str, priority: int, kwargs: Dict):
+        started = time.monotonic()
+        try:
+            return await self.scheduler.create(priority=priority, **{**kwargs, "model": model})
+        finally:
+            stats = self._latency.setdefault(model, {"calls": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += time.monotonic() - started
+
+    @staticmethod
+    def _valid(validate: Callable[[Any], bool], response) -> bool:
+        try:
+            return bool(validate(response))
+        except Exception:
+            return False
+
+    def _record(self, task: str, model: str, reason: str):
+        counts = self._decisions.setdefault(task, {})
+        counts[model] = counts.get(model, 0) + 1
+        if self.observer is not None:
+            try:
+                self.observer(task, model, reason)
+            except Exception as e:
+                print(f"Model router observer failed: {str(e)}")
+
+    def metrics(self) -> Dict:
+        return {
+            "default_model": self.default_model,
+            "routes": {task: {"model": model, "max_chars": max_chars} for task, (model, max_chars) in self.routes.items()},
+            "decisions": {task: dict(counts) for task, counts in self._decisions.items()},
+            "fallbacks": dict(self._fallbacks),
+            # Includes time queued in the scheduler; the Prometheus histogram has the bare request latency
+            "latency": {
+                model: {**stats, "mean_seconds": stats["seconds"] / stats["calls"] if stats["calls"] else 0.0}
+                for model, stats in self._latency.items()
+            },
+        }
@@ -0,0 +1,100 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Common English words that carry no retrieval signal
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "does", "for", "from",
+    "had", "has", "have", "he", "her", "his", "how", "i", "if", "in", "is", "it", "its", "me",
+    "my", "of", "on", "or", "our", "she", "so", "that", "the", "their", "them", "then", "there",
+    "they", "this", "to", "was", "we", "were", "what", "when", "where", "which", "who", "why",
+    "will", "with", "you", "your",
+}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def group_segments(transcript_data: List[Dict], window_chars: int = 600) -> List[Dict]:
+    """Merge short caption lines into retrieval segments of about window_chars characters"""
+    segments = []
+    texts, size, start, end = [], 0, None, None
+    for entry in transcript_data:
+        if start is None:
+            start = entry.get("start")
+        if entry.get("start") is not None:
+            end = entry["start"] + entry.get("duration", 0)
+        texts.append(entry["text"])
+        size += len(entry["text"]) + 1
+        if size >= window_chars:
+            segments.append({"start": start, "end": end, "text": " ".join(texts)})
+            texts, size, start, end = [], 0, None, None
+    if texts:
+        segments.append({"start": start, "end": end, "text": " ".join(texts)})
+    return segments
+
+
+class TranscriptIndex:
+    """Okapi BM25 index over the timestamped segments of one transcript"""
+
+    def __init__(self, segments: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.segments = segments
+        self.k1 = k1
+        self.b = b
+        self._term_freqs = [Counter(tokenize(segment["text"])) for segment in segments]
+        self._lengths = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+        document_freqs = Counter()
+        for freqs in self._term_freqs:
+            document_freqs.update(freqs.keys())
+        total = len(segments)
+        self._idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_freqs.items()
+        }
+
+    @classmethod
+    def from_transcript(cls, transcript_data: List[Dict], window_chars: int = 600) -> "TranscriptIndex":
+        return cls(group_segments(transcript_data, window_chars))
+
+    def score(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        scores = []
+        for freqs, length in zip(self._term_freqs, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            for term in terms:
+                freq = freqs.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Top-k segments for the query, returned in transcript order"""
+        scores = self.score(query)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        hits = [i for i in ranked[:top_k] if scores[i] > 0]
+        if not hits:
+            # Nothing matched lexically; the opening segments are the most useful fallback
+            hits = list(range(min(top_k, len(self.segments))))
+        return [self.segments[i] for i in sorted(hits)]
+
+
+def rank_triples(relationships: List[Dict], query: str, limit: int = 10, context: Optional[str] = None) -> List[Dict]:
+    """Graph triples ordered by term overlap with the query (and retrieved context), best first"""
+    query_terms = set(tokenize(query))
+    context_terms = set(tokenize(context)) if context else set()
+
+    def overlap(rel: Dict) -> float:
+        terms = set(tokenize(" ".join(str(rel.get(key) or "") for key in ("from", "rel", "to"))))
+        return 2 * len(terms & query_terms) + len(terms & context_terms)
+
+    scored = [(overlap(rel), i, rel) for i, rel in enumerate(relationships)]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [rel for _, _, rel in scored[:limit]]
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process backend is available
+    fcntl = None
+
+
+class LocalLockBackend:
+    """No cross-process locking; coalescing happens only inside this worker"""
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float):
+        yield True
+
+
+class FileLockBackend:
+    """Cross-worker locks using flock() on one lock file per key.
+
+    Works for every uvicorn worker on the same host. The OS drops the lock when a
+    worker dies, so a crash never leaves a stale lock behind. Keys never share a file,
+    so flights nested inside another (summary -> graph -> transcript) only wait on the
+    keys they name and always take them in that order, which rules out lock cycles
+    between workers. Any backend with the same lock() context manager (e.g. one built
+    on Redis) can replace it.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 0.05):
+        if fcntl is None:
+            raise RuntimeError("FileLockBackend needs fcntl, which is not available on this platform")
+        self.directory = directory
+        self.poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".lock")
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float):
+        path = self._path(key)
+        fd = await self._acquire(path, timeout)
+        try:
+            # On timeout the caller proceeds unlocked rather than failing the request
+            yield fd is not None
+        finally:
+            if fd is not None:
+                self._release(path, fd)
+
+    async def _acquire(self, path: str, timeout: float) -> Optional[int]:
+        deadline = time.monotonic() + timeout
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                if time.monotonic() >= deadline:
+                    return None
+                await asyncio.sleep(self.poll_interval)
+                continue
+            # The previous holder unlinks the file on release; a lock on that orphaned file guards nothing
+            try:
+                if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _release(self, path: str, fd: int):
+        # Removed while still locked, so the lock directory does not collect a file per key ever seen
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one computation.
+
+    Callers in this worker share one in-flight task. Across workers, the lock backend
+    serialises the computation, and `lookup` (typically a cache read) is checked once
+    the lock is held, so followers pick up the leader's stored result instead of recomputing.
+    """
+
+    def __init__(self, lock_backend=None, lock_timeout: float = 300):
+        self.lock_backend = lock_backend or LocalLockBackend()
+        self.lock_timeout = lock_timeout
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn, lookup))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so a caller that disconnects does not cancel the work other callers wait on
+        return await asyncio.shield(task)
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+    async def _run(self, key: str, fn, lookup):
+        async with self.lock_backend.lock(key, self.lock_timeout):
+            if lookup is not None:
+                result = lookup()
+                if inspect.isawaitable(result):
+                    result = await result
+                if result is not None:
+                    return result
+            return await fn()
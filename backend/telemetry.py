@@ -0,0 +1,230 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; covers cache hits through multi-minute map-reduce runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_stage = contextvars.ContextVar("telemetry_stage", default="none")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [count per bucket (not cumulative)..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(series[-1])}")
+        return lines
+
+
+class Collected:
+    """Metric read from a callback at scrape time, e.g. a queue depth owned by another object"""
+
+    def __init__(self, name: str, help: str, kind: str, collect: Callable[[], Iterable[Tuple[Dict, float]]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect():
+            names = tuple(labels)
+            lines.append(f"{self.name}{_format_labels(names, tuple(labels[name] for name in names))} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def collected(self, name: str, help: str, kind: str, collect) -> Collected:
+        return self._register(Collected(name, help, kind, collect))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "vidinsights_stage_duration_seconds", "Time spent in each pipeline stage", ("stage", "status")
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "vidinsights_llm_request_duration_seconds", "Groq chat completion latency, excluding queueing",
+    ("model", "stage", "status")
+)
+LLM_TOKENS = registry.counter(
+    "vidinsights_llm_tokens_total", "Tokens reported by Groq per chat completion", ("model", "stage", "kind")
+)
+LLM_ROUTES = registry.counter(
+    "vidinsights_llm_route_decisions_total", "Model chosen per chat completion, by task and reason", ("task", "model", "reason")
+)
+TRANSCRIPT_CHARS = registry.counter(
+    "vidinsights_transcript_chars_total", "Transcript characters before and after compaction", ("stage",)
+)
+NEO4J_QUERY_SECONDS = registry.histogram(
+    "vidinsights_neo4j_query_duration_seconds", "Neo4j query and transaction latency", ("query", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "vidinsights_http_request_duration_seconds", "API request latency until the response starts",
+    ("method", "route", "status")
+)
+
+# OpenTelemetry spans are opt-in; exporting them needs the SDK and an exporter configured,
+# for example by running under `opentelemetry-instrument`
+_tracer = None
+if os.getenv("TELEMETRY_OTEL", "0").lower() in ("1", "true", "yes"):
+    try:
+        from opentelemetry import trace
+
+        _tracer = trace.get_tracer("vidinsights")
+    except ImportError:
+        print("TELEMETRY_OTEL is set but opentelemetry-api is not installed; traces are disabled")
+
+
+def current_stage() -> str:
+    return _current_stage.get()
+
+
+@contextmanager
+def span(stage: str, **attributes):
+    """Time a pipeline stage into STAGE_SECONDS (and an OpenTelemetry span when enabled).
+
+    The stage name is visible to nested code through current_stage(), so LLM calls
+    made inside it are attributed to it.
+    """
+    token = _current_stage.set(stage)
+    otel_span = _tracer.start_as_current_span(stage, attributes=attributes) if _tracer else nullcontext()
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        with otel_span:
+            yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage, status=status)
+        _current_stage.reset(token)
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels):
+    """Observe the duration of the block, labelled with status ok/error"""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, status=status, **labels)
+
+
+def traced(stage: str):
+    """Decorator form of span() for async functions"""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_llm_call(model: Optional[str], seconds: float, usage, error: Optional[BaseException]):
+    """LLMScheduler observer: latency and token counts for one completion attempt"""
+    stage = current_stage()
+    LLM_REQUEST_SECONDS.observe(seconds, model=model or "", stage=stage, status="error" if error else "ok")
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model or "", stage=stage, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model or "", stage=stage, kind="completion")
+
+
+def record_route(task: str, model: str, reason: str):
+    """ModelRouter observer: one routing decision"""
+    LLM_ROUTES.inc(task=task, model=model, reason=reason)
@@ -0,0 +1,154 @@
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from retrieval import tokenize
+
+NON_WORD = re.compile(r"\W+", re.UNICODE)
+
+# "12:30", "1:02:03"; "minute 12", "12 minutes", "12 min"
+CLOCK_PATTERN = re.compile(r"\b(?:(\d{1,2}):)?(\d{1,2}):(\d{2})\b")
+MINUTES_PATTERN = re.compile(r"\b(?:minute\s+(\d{1,3})|(\d{1,3})\s*(?:minutes?|mins?)\b)", re.IGNORECASE)
+
+
+def fold(text: str) -> str:
+    """Lowercase with every run of punctuation and whitespace collapsed to one space"""
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Seconds from "MM:SS" or "H:MM:SS" (or a number), None if it is neither"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = CLOCK_PATTERN.fullmatch(str(value or "").strip())
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def find_time_references(text: str) -> List[float]:
+    """Times mentioned in a question ("at 12:30", "around minute 5"), in seconds, in order of appearance"""
+    references = []
+    for match in CLOCK_PATTERN.finditer(text):
+        hours, minutes, seconds = match.groups()
+        references.append((match.start(), int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)))
+    for match in MINUTES_PATTERN.finditer(text):
+        references.append((match.start(), int(match.group(1) or match.group(2)) * 60))
+    return [float(seconds) for _, seconds in sorted(references)]
+
+
+class TimestampIndex:
+    """Start times, durations and character offsets of transcript segments in flat arrays.
+
+    Offsets point into the folded, space-joined transcript text, so a text match maps back
+    to a segment (and its start time) with one binary search. Each term's segments are kept
+    as an array too, for matching topics that paraphrase the transcript.
+    """
+
+    def __init__(self, segments: List[Dict]):
+        self.timed = bool(segments) and all(segment.get("start") is not None for segment in segments)
+        self.starts = array("d")
+        self.durations = array("d")
+        self.offsets = array("q")
+        self.texts = []
+        self._postings: Dict[str, array] = {}
+        folded, position = [], 0
+        for segment in segments:
+            start = segment.get("start") or 0.0
+            if "duration" in segment:
+                duration = segment["duration"] or 0.0
+            else:
+                duration = max(0.0, (segment.get("end") or start) - start)
+            self.starts.append(start)
+            self.durations.append(duration)
+            self.offsets.append(position)
+            self.texts.append(segment["text"])
+            piece = fold(segment["text"])
+            for term in set(tokenize(piece)):
+                self._postings.setdefault(term, array("i")).append(len(self.texts) - 1)
+            folded.append(piece)
+            position += len(piece) + 1
+        self.text = " ".join(folded)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segment(self, i: int) -> Dict:
+        return {"start": self.starts[i], "duration": self.durations[i], "text": self.texts[i]}
+
+    def segment_at(self, seconds: float) -> int:
+        """Index of the segment being spoken at the given time"""
+        return max(0, bisect_right(self.starts, seconds) - 1)
+
+    def segment_at_offset(self, offset: int) -> int:
+        return max(0, bisect_right(self.offsets, offset) - 1)
+
+    def range(self, start: float, end: float) -> List[Dict]:
+        """Segments overlapping [start, end) seconds"""
+        if not self.timed or end <= start:
+            return []
+        first = self.segment_at(start)
+        if self.starts[first] + self.durations[first] <= start:
+            first += 1
+        last = bisect_left(self.starts, end)
+        return [self.segment(i) for i in range(first, last)]
+
+    def locate(self, query: str, hint: Optional[float] = None, window_seconds: float = 60.0) -> Optional[Tuple[float, int]]:
+        """(start seconds, segment) where the query is discussed, or None without a convincing match.
+
+        An exact phrase match wins. Otherwise the window of window_seconds covering the most
+        query terms, weighted by rarity, is chosen; ties go to the window nearest the hint.
+        """
+        if not self.timed:
+            return None
+
+        phrase = fold(query)
+        if len(phrase) >= 12:
+            offset = self.text.find(phrase)
+            if offset >= 0:
+                i = self.segment_at_offset(offset)
+                return self.starts[i], i
+
+        hits = []
+        terms = set(tokenize(query))
+        for term in terms:
+            segments = self._postings.get(term)
+            if segments:
+                weight = math.log(1 + len(self) / len(segments))
+                hits.extend((i, term, weight) for i in segments)
+        matched_terms = {term for _, term, _ in hits}
+        # A single shared word is too weak a signal unless the query is one word
+        if not matched_terms or (len(matched_terms) < 2 and len(terms) > 1):
+            return None
+        hits.sort()
+
+        best, best_key = None, None
+        in_window = Counter()
+        weights = {term: weight for _, term, weight in hits}
+        score, right = 0.0, 0
+        for left, (first, _, _) in enumerate(hits):
+            window_end = self.starts[first] + window_seconds
+            while right < len(hits) and self.starts[hits[right][0]] < window_end:
+                term = hits[right][1]
+                if in_window[term] == 0:
+                    score += weights[term]
+                in_window[term] += 1
+                right += 1
+            distinct = sum(1 for count in in_window.values() if count)
+            if distinct >= min(2, len(terms)):
+                distance = abs(self.starts[first] - hint) if hint is not None else 0.0
+                key = (round(score, 9), -distance)
+                if best_key is None or key > best_key:
+                    best, best_key = first, key
+            term = hits[left][1]
+            in_window[term] -= 1
+            if in_window[term] == 0:
+                score -= weights[term]
+
+        if best is None:
+            return None
+        return self.starts[best], best
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zlib from the standard library is used instead
+    zstandard = None
+
+# Segments per compressed block, so no single row grows with the length of a transcript
+BLOCK_SEGMENTS = 200
+
+
+def segments_from_text(transcript_text: str, segment_chars: int = 500) -> List[Dict]:
+    """Untimed pseudo-segments for transcripts that are only available as plain text"""
+    segments = []
+    words, size = [], 0
+    for word in transcript_text.split():
+        words.append(word)
+        size += len(word) + 1
+        if size >= segment_chars:
+            segments.append({"text": " ".join(words)})
+            words, size = [], 0
+    if words:
+        segments.append({"text": " ".join(words)})
+    return segments
+
+
+def has_timings(segments: List[Dict]) -> bool:
+    """False for segments_from_text output, e.g. transcripts migrated off Neo4j nodes as plain text"""
+    return any(segment.get("start") is not None for segment in segments)
+
+
+def _compress(data: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=9).compress(data)
+    return "zlib", zlib.compress(data, 9)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcript was stored with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class TranscriptStore:
+    """Compressed raw transcript segments in SQLite, keyed by video_id, in blocks of BLOCK_SEGMENTS"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT PRIMARY KEY,
+                segments INTEGER NOT NULL,
+                chars INTEGER NOT NULL,
+                duration REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_blocks (
+                video_id TEXT NOT NULL,
+                block INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (video_id, block)
+            )
+        """)
+
+    def put(self, video_id: str, segments: List[Dict]):
+        rows = []
+        for block, offset in enumerate(range(0, len(segments), BLOCK_SEGMENTS)):
+            chunk = segments[offset:offset + BLOCK_SEGMENTS]
+            codec, data = _compress(json.dumps(chunk, ensure_ascii=False).encode("utf-8"))
+            rows.append((video_id, block, codec, data))
+
+        last = segments[-1] if segments else {}
+        duration = last["start"] + last.get("duration", 0) if last.get("start") is not None else None
+        chars = sum(len(segment["text"]) for segment in segments)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM transcript_blocks WHERE video_id = ?", (video_id,))
+                self._conn.executemany(
+                    "INSERT INTO transcript_blocks (video_id, block, codec, data) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO transcripts (video_id, segments, chars, duration, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (video_id, len(segments), chars, duration, time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def has(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM transcripts WHERE video_id = ?", (video_id,)).fetchone()
+        return row is not None
+
+    def get(self, video_id: str) -> Optional[List[Dict]]:
+        if not self.has(video_id):
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT codec, data FROM transcript_blocks WHERE video_id = ? ORDER BY block", (video_id,)
+            ).fetchall()
+        segments = []
+        for codec, data in rows:
+            segments.extend(json.loads(_decompress(codec, data)))
+        return segments
+
+
+def migrate_from_graph(store: TranscriptStore, driver, batch_size: int = 100) -> int:
+    """Move transcripts off existing Neo4j Video nodes into the store, leaving a reference behind"""
+    migrated = 0
+    with driver.session() as session:
+        while True:
+            records = session.run("""
+                MATCH (v:Video) WHERE v.transcript IS NOT NULL AND v.video_id IS NOT NULL
+                RETURN v.video_id as video_id, v.transcript as transcript
+                LIMIT $batch_size
+            """, batch_size=batch_size).data()
+            if not records:
+                break
+
+            for record in records:
+                # Only plain text survives on the node. The untimed segments are a fallback:
+                # the first request for the video fetches the timed transcript and replaces them
+                if not store.has(record["video_id"]):
+                    store.put(record["video_id"], segments_from_text(record["transcript"]))
+
+            session.run("""
+                UNWIND $video_ids AS video_id
+                MATCH (v:Video {video_id: video_id})
+                SET v.transcript_ref = video_id
+                REMOVE v.transcript
+            """, video_ids=[record["video_id"] for record in records]).consume()
+            migrated += len(records)
+            print(f"Migrated {migrated} transcripts")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcript store maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate = subcommands.add_parser("migrate", help="move transcripts off Neo4j Video nodes into the store")
+    migrate.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from neo4j import GraphDatabase
+
+    load_dotenv()
+    store = TranscriptStore(os.getenv("TRANSCRIPT_STORE_PATH", "transcripts.db"))
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+    try:
+        total = migrate_from_graph(store, driver, args.batch_size)
+        print(f"Done, {total} transcripts moved to {store.path}")
+    finally:
+        driver.close()
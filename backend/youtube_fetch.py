@@ -0,0 +1,96 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+# youtube_transcript_api errors meaning the video has no transcript to give, as opposed to a failed request.
+# Matched by name so the package is only imported when a transcript is first fetched.
+UNAVAILABLE_ERRORS = {
+    "TranscriptsDisabled", "NoTranscriptFound", "VideoUnavailable", "VideoUnplayable", "InvalidVideoId", "AgeRestricted",
+}
+# Errors meaning YouTube is throttling this host
+BLOCKED_ERRORS = {"RequestBlocked", "IpBlocked"}
+
+
+def is_unavailable(e: Exception) -> bool:
+    return type(e).__name__ in UNAVAILABLE_ERRORS
+
+
+def is_blocked(e: Exception) -> bool:
+    return type(e).__name__ in BLOCKED_ERRORS
+
+
+def http2_available() -> bool:
+    """httpx only speaks HTTP/2 with the h2 package installed (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def pooled_session(pool_size: int):
+    """requests session keeping up to pool_size connections alive, for youtube_transcript_api"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FetchPool:
+    """Concurrency limit and request pacing shared by every fetch from one site.
+
+    At most max_concurrency fetches run at once, and with requests_per_second set their starts
+    are spaced evenly. back_off() holds every new fetch for a while after the site throttles us.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_second: float = 0.0):
+        self.max_concurrency = max_concurrency
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._next_start = 0.0
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.backoffs = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            now = time.monotonic()
+            start = max(now, self._next_start, self._paused_until)
+            self._next_start = start + self.interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            self.in_flight += 1
+            self.requests += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def back_off(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.backoffs += 1
+
+    def metrics(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "backoffs": self.backoffs,
+            "paused_seconds": max(0.0, self._paused_until - time.monotonic()),
+        }